@@ -1,33 +1,58 @@
 from __future__ import annotations
 
 import argparse
-import json
+import functools
+import math
+import operator
 import os
-import re
 import signal
 import sys
+import tempfile
+import threading
 import time
-from typing import Any, Dict, List, Tuple
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterator, List, Tuple
 
-from src.utils.discovery import walk_sources, filter_paths
-from src.utils.encoding import detect_encoding
+import orjson
+
+try:
+    import msgspec  # type: ignore
+except Exception:  # pragma: no cover
+    msgspec = None  # fallback to _loads + RpcMsg dataclass
+
+from src.utils.discovery import allow_set, allowed_sources, walk_sources
+from src.utils.encoding import BOM_PREFIXES, detect_encoding_view
 from src.utils.hashing import sha256_bytes
+from src.utils import parse_cache
 from src.utils.validator import SchemaRegistry
+from src.utils.paths import normalize_root
 from src.utils.indexer import build_source_index, derive_copy_paths
-from src.parser.proleap_adapter import ProLeapAdapter
+from src.parser.proleap_adapter import ProLeapAdapter, skip_trivial_enabled
 from src.parser.normalizer import normalize_copybook, normalize_program
 
-_shutdown = False
+# Set from the signal handlers; checked by the stdio loop and between parse groups.
+_shutdown = threading.Event()
+
+PARSER_VERSION = "normalizer=1.0.0,adapter=proleap/0.0.2"
+
+# Source-index kinds that parse_tree turns into artifacts
+_PARSE_KINDS = frozenset({"cobol", "copybook"})
 
 # ----------------------------- Signals ---------------------------------
 def _sigterm_handler(signum, frame):
-    global _shutdown
-    _shutdown = True
+    _shutdown.set()
 
 signal.signal(signal.SIGTERM, _sigterm_handler)
 signal.signal(signal.SIGINT, _sigterm_handler)
 
 # --------------------------- Path Normalizer ---------------------------
+@functools.lru_cache(maxsize=1)
+def _ws_env() -> Tuple[str | None, str]:
+    return os.environ.get("WORKSPACE_HOST"), os.environ.get("WORKSPACE_CONTAINER", "/mnt/work")
+
 def _normalize_root(root: str) -> str:
     """
     Map a host path to the container mount so the tool works across
@@ -37,39 +62,54 @@ def _normalize_root(root: str) -> str:
       WORKSPACE_HOST: absolute host path (e.g. /Users/alice/Projects/Renova)
       WORKSPACE_CONTAINER: mount path inside container (default: /mnt/work)
     """
-    if not root:
-        return root
-
-    ws_host = os.environ.get("WORKSPACE_HOST")
-    ws_ctr = os.environ.get("WORKSPACE_CONTAINER", "/mnt/work")
-
-    # Already container-relative?
-    if root.startswith(ws_ctr):
-        return root
+    return normalize_root(root, *_ws_env())
 
-    # Normalize Windows-style paths C:\\foo\\bar → /c/foo/bar
-    r = root
-    if re.match(r"^[A-Za-z]:\\", r):
-        drive, rest = r[:2], r[2:]
-        r = f"/{drive[0].lower()}{rest}".replace("\\", "/")
-    else:
-        r = r.replace("\\", "/")
-
-    # Replace workspace host prefix with container prefix
-    if ws_host:
-        ws_host_norm = ws_host.replace("\\", "/").rstrip("/")
-        if r.startswith(ws_host_norm + "/") or r == ws_host_norm:
-            suffix = r[len(ws_host_norm):].lstrip("/")
-            return os.path.join(ws_ctr, suffix) if suffix else ws_ctr
-
-    # Relative paths → resolve against container workspace
-    if not r.startswith("/"):
-        return os.path.normpath(os.path.join(ws_ctr, r))
-
-    # As-is if valid, else best-effort remap
-    if os.path.exists(r):
-        return r
-    return os.path.join(ws_ctr, r.lstrip("/"))
+def _copy_fingerprint(index_data: Dict[str, Any], copy_dirs_rel: List[str]) -> str:
+    """
+    Digest of everything COPY expansion can see, so cached program parses are
+    invalidated when a copybook changes.
+    """
+    parts = list(copy_dirs_rel)
+    for f in index_data.get("files", []) or []:
+        if f.get("kind") == "copybook":
+            parts.append(f"{f.get('relpath')}={f.get('sha256')}")
+    return sha256_bytes("\n".join(parts).encode("utf-8"))
+
+# Parse targets + copy dirs per (root, index signature, selection); pages 2..N of a
+# paginated run slice the cached list. Entries expire so background edits show up.
+_TARGETS_TTL = 60.0
+_TARGETS_MAX = 8
+_TARGETS_CACHE: Dict[Tuple[Any, ...], Tuple[float, Tuple[List[Tuple[str, str, str]], List[str], str]]] = {}
+
+def _index_signature(index_data: Dict[str, Any]) -> str:
+    files = index_data.get("files", []) or []
+    return sha256_bytes(orjson.dumps(files))
+
+def _targets_get(key: Tuple[Any, ...]) -> Tuple[List[Tuple[str, str, str]], List[str], str] | None:
+    hit = _TARGETS_CACHE.get(key)
+    if hit is None or time.monotonic() - hit[0] > _TARGETS_TTL:
+        return None
+    return hit[1]
+
+def _targets_put(key: Tuple[Any, ...], value: Tuple[List[Tuple[str, str, str]], List[str], str]) -> None:
+    now = time.monotonic()
+    for k in [k for k, (ts, _) in _TARGETS_CACHE.items() if now - ts > _TARGETS_TTL]:
+        del _TARGETS_CACHE[k]
+    if len(_TARGETS_CACHE) >= _TARGETS_MAX:
+        del _TARGETS_CACHE[min(_TARGETS_CACHE, key=lambda k: _TARGETS_CACHE[k][0])]
+    _TARGETS_CACHE[key] = (now, value)
+
+# Validation verdicts for source indexes already checked, keyed by
+# (schema_dir, root, index signature); the index body is the largest artifact.
+_INDEX_VALID: Dict[Tuple[str, str, str], bool] = {}
+
+def _index_is_valid(registry: SchemaRegistry, key: Tuple[str, str, str], artifact: Dict[str, Any]) -> bool:
+    ok = _INDEX_VALID.get(key)
+    if ok is None:
+        if len(_INDEX_VALID) >= _TARGETS_MAX:
+            _INDEX_VALID.clear()
+        ok = _INDEX_VALID[key] = not registry.validate(artifact)
+    return ok
 
 # ------------------------------ Tools ----------------------------------
 def list_tools() -> Dict[str, Any]:
@@ -116,6 +156,16 @@ def list_tools() -> Dict[str, Any]:
                             "minimum": 0,
                             "default": 60,
                             "description": "Soft time budget; the tool returns partial results and a continuation cursor when reached (0 disables)."
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "default": False,
+                            "description": "If true, each artifact is sent as a notifications/artifact message as soon as it is ready; the final result carries only stats, diagnostics and continuation."
+                        },
+                        "ndjson": {
+                            "type": "boolean",
+                            "default": False,
+                            "description": "If true (and stream is not), artifacts are appended to an NDJSON file as they are ready; the result returns artifacts_ndjson_path and artifacts_count instead of the list. Dir: ARTIFACTS_NDJSON_DIR (default: system temp)."
                         }
                     },
                     "additionalProperties": False
@@ -124,8 +174,411 @@ def list_tools() -> Dict[str, Any]:
         ]
     }
 
+# ------------------------------ Workers --------------------------------
+# Per-process parser state, shared by every parse_tree call in this process.
+# Pool workers build their own on start-up (see _init_worker).
+_ADAPTER: ProLeapAdapter | None = None
+_ADAPTER_LOCK = threading.Lock()
+
+# Worker pool kept for the life of the server so pages after the first don't pay
+# process start-up + _init_worker again; rebuilt when its size or schema dir changes.
+_POOL: ProcessPoolExecutor | None = None
+_POOL_KEY: Tuple[int, str] | None = None
+_POOL_LOCK = threading.Lock()
+
+# How many files the inline path reads ahead of the parser.
+_PREFETCH_DEPTH = 8
+
+# Cache outcome per file: served from the index hash without reading, served after
+# reading, freshly parsed, or none of these (read/decode failure, unknown kind).
+# Copies of a file parsed earlier in the same page never reach the cache at all.
+CACHE_REUSED, CACHE_HIT, CACHE_MISS, CACHE_NONE = "reused", "hit", "miss", ""
+DEDUPED = "deduped"
+
+# (relpath, artifact_or_None, diagnostics, cache_outcome)
+ParseResult = Tuple[str, Dict[str, Any] | None, List[Dict[str, Any]], str]
+# (text_or_None, sha256, diagnostics, path whose bytes are text in UTF-8 or "")
+Loaded = Tuple[str | None, str, List[Dict[str, Any]], str]
+# (sha256, encoding) recorded by the source index for a relpath; "" when unknown.
+Hint = Tuple[str, str]
+_NO_HINT: Hint = ("", "")
+
+# Encodings whose strict decode implies the raw bytes are already the UTF-8 text
+_UTF8_SAFE = frozenset({"utf-8", "utf8", "ascii"})
+
+@functools.lru_cache(maxsize=4)
+def _registry(schema_dir: str) -> SchemaRegistry:
+    return SchemaRegistry(schema_dir)
+
+def _adapter() -> ProLeapAdapter:
+    global _ADAPTER
+    if _ADAPTER is None:
+        with _ADAPTER_LOCK:
+            if _ADAPTER is None:
+                _ADAPTER = ProLeapAdapter()
+    return _ADAPTER
+
+def _init_worker(schema_dir: str) -> None:
+    _registry(schema_dir)
+    _adapter()
+
+def _parse_workers() -> int:
+    try:
+        n = int(os.environ.get("RENOVA_PARSE_WORKERS") or os.cpu_count() or 1)
+    except ValueError:
+        n = 1
+    return max(1, n)
+
+def _pool(workers: int, schema_dir: str) -> ProcessPoolExecutor:
+    global _POOL, _POOL_KEY
+    with _POOL_LOCK:
+        # _broken is set once a worker died; such a pool rejects every submit
+        if _POOL is None or _POOL_KEY != (workers, schema_dir) or getattr(_POOL, "_broken", False):
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(schema_dir,))
+            _POOL_KEY = (workers, schema_dir)
+        return _POOL
+
+def _shutdown_workers() -> None:
+    """Stop the worker pool and this process's adapter; called once on server exit."""
+    global _POOL, _ADAPTER
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+            _POOL = None
+    with _ADAPTER_LOCK:
+        if _ADAPTER is not None:
+            _ADAPTER.shutdown()
+            _ADAPTER = None
+
+def _artifact_kind(kind: str) -> str:
+    return "cam.cobol.program" if kind == "cobol" else "cam.cobol.copybook"
+
+def _cache_key(content_hash: str, rel_p: str, kind: str, dialect: str, copy_fp: str) -> str:
+    # skipped-trivial programs carry the regex AST, so they must not serve full runs
+    extra = (copy_fp + (":skip-trivial" if skip_trivial_enabled() else "")) if kind == "cobol" else ""
+    return parse_cache.make_key(content_hash, kind, dialect, os.path.basename(rel_p), PARSER_VERSION, extra)
+
+def _cached_artifact(
+    content_hash: str, rel_p: str, kind: str, dialect: str, debug_raw: bool, copy_fp: str
+) -> Dict[str, Any] | None:
+    # Cached bodies were validated when stored; dumps need a real parse, so skip on debug_raw.
+    if debug_raw or not content_hash:
+        return None
+    body = parse_cache.get(_cache_key(content_hash, rel_p, kind, dialect, copy_fp))
+    if body is None:
+        return None
+    body["source"] = {"relpath": rel_p, "sha256": content_hash}
+    return {"kind": _artifact_kind(kind), "version": "1.0.0", "body": body}
+
+def _decode_view(buf: Any, enc_hint: str) -> Tuple[str, int, str]:
+    """
+    Decode with the source index's encoding when it has one and the file has no
+    BOM; detection only runs when the hint is missing or does not decode.
+    Returns (encoding, bom_length, text).
+    """
+    if enc_hint and not bytes(buf[:3]).startswith(BOM_PREFIXES):
+        try:
+            return enc_hint, 0, str(buf, enc_hint, "strict")
+        except (UnicodeDecodeError, LookupError):
+            pass
+    enc, bom_len = detect_encoding_view(buf)
+    with memoryview(buf) as mv, mv[bom_len:] as payload:
+        return enc, bom_len, str(payload, enc, "strict")
+
+def _load_one(abs_p: str, rel_p: str, sha_hint: str = "", enc_hint: str = "") -> Loaded:
+    """
+    Read + decode + hash one file. Returns (text_or_None, sha256, diagnostics,
+    src_path); src_path is abs_p when the file is BOM-less UTF-8/ASCII, so the
+    adapter can hand it to the JVM as is. Hash and decode both run over one
+    zero-copy view of the bytes read. Without a BOM the payload is the whole
+    file, so the source-index hash is reused as is.
+    """
+    try:
+        with open(abs_p, "rb") as f:
+            buf = f.read()
+    except Exception as e:
+        return None, "", [{"level": "warning", "relpath": rel_p, "message": f"Read error: {e}"}], ""
+
+    try:
+        enc, bom_len, text = _decode_view(buf, enc_hint)
+    except Exception as e:
+        return None, "", [{"level": "warning", "relpath": rel_p, "message": f"Decode failed: {e}"}], ""
+    if sha_hint and not bom_len:
+        content_hash = sha_hint
+    else:
+        with memoryview(buf) as mv, mv[bom_len:] as payload:
+            content_hash = sha256_bytes(payload)
+
+    src_path = abs_p if not bom_len and enc.lower() in _UTF8_SAFE else ""
+    return text, content_hash, [], src_path
+
+def _prefetch_one(
+    abs_p: str, rel_p: str, kind: str, hint: Hint, job_args: Tuple[Any, ...]
+) -> Tuple[ParseResult | None, Loaded | None]:
+    """
+    I/O half of the pipeline. Files whose source-index hash already has a cached
+    artifact are served without being opened; everything else is read + hashed.
+    """
+    dialect, debug_raw, _raw_dump_dir, _copy_dirs_abs, copy_fp, _schema_dir = job_args
+    sha_hint, enc_hint = hint
+    hit = _cached_artifact(sha_hint, rel_p, kind, dialect, debug_raw, copy_fp)
+    if hit is not None:
+        return (rel_p, hit, [], CACHE_REUSED), None
+    return None, _load_one(abs_p, rel_p, sha_hint, enc_hint)
+
+def _parse_loaded_many(
+    items: List[Tuple[str, str, Loaded]],
+    dialect: str,
+    debug_raw: bool,
+    raw_dump_dir: str,
+    copy_dirs_abs: List[str],
+    copy_fp: str,
+    schema_dir: str,
+) -> List[ParseResult]:
+    """
+    Parse, normalize and validate files already read by `_load_one`, given as
+    (relpath, kind, loaded). Programs go to the adapter as one batch so cached
+    ASTs are looked up together.
+    """
+    registry, adapter = _registry(schema_dir), _adapter()
+    results: List[ParseResult | None] = [None] * len(items)
+    asts: List[Tuple[int, Dict[str, Any]]] = []
+    programs: List[int] = []
+
+    for i, (rel_p, kind, (text, content_hash, diags, src_path)) in enumerate(items):
+        if text is None:
+            results[i] = (rel_p, None, diags, CACHE_NONE)
+            continue
+        hit = _cached_artifact(content_hash, rel_p, kind, dialect, debug_raw, copy_fp)
+        if hit is not None:
+            results[i] = (rel_p, hit, [], CACHE_HIT)
+        elif kind == "cobol":
+            programs.append(i)
+        elif kind == "copybook":
+            asts.append((i, adapter.parse_copybook(
+                text, rel_p, dialect, debug_raw, raw_dump_dir, src_path=src_path or None
+            )))
+        else:
+            results[i] = (rel_p, None, [], CACHE_NONE)
+
+    if programs:
+        batch = [(items[i][2][0], items[i][0], items[i][2][3] or None) for i in programs]
+        asts.extend(zip(programs, adapter.parse_programs(batch, dialect, debug_raw, raw_dump_dir, copy_dirs_abs)))
+
+    for i, ast in asts:
+        rel_p, kind, (_text, content_hash, _diags, _src) = items[i]
+        if kind == "cobol":
+            data = normalize_program(ast, relpath=rel_p, sha256=content_hash)
+        else:
+            data = normalize_copybook(ast, relpath=rel_p, sha256=content_hash)
+        artifact = {"kind": _artifact_kind(kind), "version": "1.0.0", "body": data}
+        if registry.validate(artifact):
+            results[i] = (rel_p, None, [], CACHE_MISS)
+            continue
+        parse_cache.put(_cache_key(content_hash, rel_p, kind, dialect, copy_fp), data)
+        results[i] = (rel_p, artifact, [], CACHE_MISS)
+    return results  # type: ignore[return-value]
+
+def _parse_fetched(
+    group: List[Tuple[str, str, str]],
+    fetched: List[Tuple[ParseResult | None, Loaded | None]],
+    job_args: Tuple[Any, ...],
+) -> List[ParseResult]:
+    """Merge `_prefetch_one` outcomes for `group`, parsing whatever was read."""
+    todo = [i for i, (hit, _loaded) in enumerate(fetched) if hit is None]
+    parsed = _parse_loaded_many([(group[i][1], group[i][2], fetched[i][1]) for i in todo], *job_args)
+    out = [hit for hit, _loaded in fetched]
+    for i, res in zip(todo, parsed):
+        out[i] = res
+    return out  # type: ignore[return-value]
+
+def _parse_many(group: List[Tuple[str, str, str]], hints: List[Hint], *job_args: Any) -> List[ParseResult]:
+    """Full pipeline for a group of files; this is what pool workers run."""
+    fetched = [_prefetch_one(*t, hint, job_args) for t, hint in zip(group, hints)]
+    return _parse_fetched(group, fetched, job_args)
+
+def _batch_size(n_targets: int, workers: int) -> int:
+    """Files per parse task: RENOVA_PARSE_BATCH (default 16), but no fewer tasks than workers."""
+    try:
+        cap = int(os.environ.get("RENOVA_PARSE_BATCH") or 16)
+    except ValueError:
+        cap = 16
+    return max(1, min(cap, -(-n_targets // workers)))
+
+def _iter_parsed(
+    targets: List[Tuple[str, str, str]],
+    hints: Dict[str, Hint],
+    job_args: Tuple[Any, ...],
+    deadline: float,
+) -> Iterator[ParseResult]:
+    """
+    Yield parse results in target order, stopping on shutdown or when the budget
+    runs out. Files are parsed in groups (see `_batch_size`) and the budget is
+    checked between groups. Only yielded results count as processed, so the
+    continuation cursor stays contiguous even when later groups were already in
+    flight; the first group is always finished so every call makes progress.
+    """
+    workers = min(_parse_workers(), len(targets))
+    size = _batch_size(len(targets), max(1, workers))
+    groups = [targets[i:i + size] for i in range(0, len(targets), size)]
+
+    if workers <= 1:
+        # Inline parse; a reader thread keeps the next few files read + hashed so
+        # disk latency hides behind the parse of the current group.
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        try:
+            loads: Deque[Future] = deque()
+            it = iter(targets)
+
+            def _submit(t: Tuple[str, str, str]) -> None:
+                loads.append(reader.submit(_prefetch_one, *t, hints.get(t[1], _NO_HINT), job_args))
+
+            for t in islice(it, _PREFETCH_DEPTH):
+                _submit(t)
+            for group in groups:
+                if _shutdown.is_set() or time.monotonic() >= deadline:
+                    return
+                fetched = []
+                for _t in group:
+                    fetched.append(loads.popleft().result())
+                    nxt = next(it, None)
+                    if nxt is not None:
+                        _submit(nxt)
+                yield from _parse_fetched(group, fetched, job_args)
+        finally:
+            reader.shutdown(wait=False, cancel_futures=True)
+        return
+
+    def _submit_group(group: List[Tuple[str, str, str]]) -> Future:
+        return ex.submit(_parse_many, group, [hints.get(t[1], _NO_HINT) for t in group], *job_args)
+
+    ex = _pool(_parse_workers(), job_args[-1])
+    pending: Deque[Future] = deque()
+    try:
+        it = iter(groups)
+        for group in islice(it, workers * 2):
+            pending.append(_submit_group(group))
+        first = True
+        while pending:
+            now = time.monotonic()
+            if _shutdown.is_set() or (now >= deadline and not first):
+                return
+            timeout = None
+            if deadline != math.inf and not first:
+                timeout = max(0.0, deadline - now)
+            try:
+                res = pending.popleft().result(timeout=timeout)
+            except FuturesTimeout:
+                return
+            first = False
+            yield from res
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(_submit_group(nxt))
+    finally:
+        # Drop queued work; groups already running finish and land in the parse cache.
+        for fut in pending:
+            fut.cancel()
+
+def _iter_deduped(
+    targets: List[Tuple[str, str, str]],
+    hints: Dict[str, Hint],
+    job_args: Tuple[Any, ...],
+    deadline: float,
+) -> Iterator[ParseResult]:
+    """
+    `_iter_parsed` that parses bit-identical files once. Copies sharing kind,
+    index sha256 and basename (names fall back to the basename) reuse the first
+    occurrence's result under their own relpath, in target order.
+    """
+    debug_raw = job_args[1]
+    first_of: Dict[Tuple[str, str, str], int] = {}
+    unique: List[Tuple[str, str, str]] = []
+    slots: List[int] = []  # per target: index into `unique`, negated-1 for copies
+    for t in targets:
+        sha = hints.get(t[1], _NO_HINT)[0]
+        key = (t[2], sha, os.path.basename(t[1]))
+        j = first_of.get(key) if sha and not debug_raw else None
+        if j is None:
+            if sha:
+                first_of[key] = len(unique)
+            slots.append(len(unique))
+            unique.append(t)
+        else:
+            slots.append(-j - 1)
+    if len(unique) == len(targets):
+        yield from _iter_parsed(targets, hints, job_args, deadline)
+        return
+
+    shared = {-s - 1 for s in slots if s < 0}
+    kept: Dict[int, ParseResult] = {}
+    parsed = _iter_parsed(unique, hints, job_args, deadline)
+    try:
+        for (_abs_p, rel_p, _kind), slot in zip(targets, slots):
+            if slot >= 0:
+                res = next(parsed, None)
+                if res is None:
+                    return
+                if slot in shared:
+                    kept[slot] = res
+                yield res
+                continue
+            _rel, art, diags, _cache = kept[-slot - 1]
+            if art is not None:
+                body = art["body"]
+                art = {**art, "body": {**body, "source": {**body["source"], "relpath": rel_p}}}
+            yield rel_p, art, [{**d, "relpath": rel_p} for d in diags], DEDUPED
+    finally:
+        parsed.close()
+
 # ------------------------------ Core -----------------------------------
-def parse_tree(inp: Dict[str, Any]) -> Dict[str, Any]:
+def _select_targets(
+    root: str, index_data: Dict[str, Any], use_source_index: bool, allow_paths: List[str]
+) -> Tuple[List[Any], List[str], str]:
+    """
+    Return (entries, copy_dirs_abs, copy_fp) for one index. Entries are the
+    index's file dicts in source-index mode and (abs, rel, kind) tuples
+    otherwise; `_page_targets` turns a page of either into tuples.
+    """
+    # Index relpaths are relative POSIX paths, so joining is a plain concat onto
+    # the root with its separator (what os.path.join would produce).
+    root_prefix = os.path.join(root, "")
+    copy_dirs_rel = derive_copy_paths(index_data)
+    copy_dirs_abs = [root_prefix + d for d in copy_dirs_rel]
+    copy_fp = _copy_fingerprint(index_data, copy_dirs_rel)
+
+    if use_source_index:
+        allowed = allow_set(allow_paths)
+        files = [
+            f for f in index_data.get("files", ())
+            if f.get("kind") in _PARSE_KINDS and (allowed is None or f.get("relpath") in allowed)
+        ]
+        # index entries always carry kind + relpath
+        files.sort(key=operator.itemgetter("kind", "relpath"))
+        return files, copy_dirs_abs, copy_fp
+    if allow_paths:
+        # explicit list: stat each entry rather than walking the whole tree
+        targets_all: List[Any] = list(allowed_sources(root, allow_paths))
+    else:
+        # walk order is filesystem order; sort so pages and buckets are stable
+        targets_all = sorted(walk_sources(root), key=operator.itemgetter(1))
+    return targets_all, copy_dirs_abs, copy_fp
+
+def _page_targets(entries: List[Any], root_prefix: str) -> List[Tuple[str, str, str]]:
+    """(abs, rel, kind) for one page; only the page's index entries get joined paths."""
+    return [
+        e if isinstance(e, tuple) else (root_prefix + e["relpath"], e["relpath"], e["kind"])
+        for e in entries
+    ]
+
+def parse_tree(inp: Dict[str, Any], emit_cb: Callable[[Dict[str, Any]], None] | None = None) -> Dict[str, Any]:
+    """
+    Parse the tree under `root`. With an `emit_cb`, artifacts are handed to the
+    callback in target order instead of being collected, so memory stays flat
+    regardless of repo size.
+    """
     root = inp.get("root")
     if not root or not isinstance(root, str):
         raise ValueError("`root` must be a non-empty string")
@@ -135,6 +588,7 @@ def parse_tree(inp: Dict[str, Any]) -> Dict[str, Any]:
     allow_paths = inp.get("paths") or []
     use_source_index: bool = bool(inp.get("use_source_index", True))
     debug_raw: bool = bool(inp.get("debug_raw", False))
+    stream: bool = emit_cb is not None
     raw_dump_dir: str = inp.get("raw_dump_dir") or os.environ.get("RAW_AST_DUMP_DIR") or "/tmp/proleap_raw"
 
     # Pagination controls
@@ -150,14 +604,32 @@ def parse_tree(inp: Dict[str, Any]) -> Dict[str, Any]:
             pass
 
     diagnostics: List[Dict[str, Any]] = []
-    artifacts: List[Dict[str, Any]] = []
+    # Buffered artifacts are bucketed by kind. Targets arrive in relpath order,
+    # so head + copybooks + programs is already the (kind, relpath) order.
+    head: List[Dict[str, Any]] = []
+    copybooks: List[Dict[str, Any]] = []
+    programs: List[Dict[str, Any]] = []
+
+    def emit(art: Dict[str, Any]) -> None:
+        if stream:
+            emit_cb(art)
+        elif art["kind"] == "cam.cobol.program":
+            programs.append(art)
+        elif art["kind"] == "cam.cobol.copybook":
+            copybooks.append(art)
+        else:
+            head.append(art)
     stats = {
         "files_scanned": 0,
         "files_total": 0,
         "start_at": max(0, start_at),
         "programs_emitted": 0,
         "copybooks_emitted": 0,
-        "parser_version": "normalizer=1.0.0,adapter=proleap/0.0.2",
+        "files_reused_from_cache": 0,
+        "files_deduplicated": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "parser_version": PARSER_VERSION,
         "raw_dump_dir": raw_dump_dir if debug_raw else ""
     }
 
@@ -171,12 +643,19 @@ def parse_tree(inp: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     schema_dir = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", "schemas"))
-    registry = SchemaRegistry(schema_dir)
-    adapter = ProLeapAdapter()
+    registry = _registry(schema_dir)
 
     # --- A) Build and emit Source Index ---
     index_data = build_source_index(root)
 
+    # Unchanged files (same index sha256 as a cached parse) skip read + parse entirely;
+    # the rest decode with the index's encoding guess instead of re-running detection.
+    # The guess only covers a file's head, so it stays internal (dropped below).
+    hints = {
+        f["relpath"]: (f.get("sha256") or "", f.get("encoding_hint") or "")
+        for f in index_data.get("files", []) or []
+    }
+
     # sanitize: drop keys not in v1.0.0 schema
     # Allowed keys confirmed against artifact-service error: remove format/copybook_dir flags etc.
     allowed = {"relpath", "size_bytes", "sha256", "kind", "language_hint", "encoding", "program_id_guess"}
@@ -185,85 +664,61 @@ def parse_tree(inp: Dict[str, Any]) -> Dict[str, Any]:
             if k not in allowed:
                 f.pop(k, None)
 
-    copy_dirs_rel = derive_copy_paths(index_data)
-    copy_dirs_abs = [os.path.join(root, d) for d in copy_dirs_rel]
-
+    index_sig = _index_signature(index_data)
     idx_artifact = {"kind": "cam.asset.source_index", "version": "1.0.0", "body": index_data}
-    if not registry.validate(idx_artifact):
-        artifacts.append(idx_artifact)
-
-    # --- B) Choose parse targets ---
-    if use_source_index:
-        files = index_data.get("files", [])
-        if allow_paths:
-            allow_set = {p.strip().lstrip("./") for p in allow_paths if p.strip()}
-            files = [f for f in files if f.get("relpath") in allow_set]
-        files = [f for f in files if f.get("kind") in {"cobol", "copybook"}]
-        files.sort(key=lambda f: (f.get("kind") or "", f.get("relpath") or ""))
-        targets_all: List[Tuple[str, str, str]] = [
-            (os.path.join(root, f["relpath"]), f["relpath"], f["kind"]) for f in files
-        ]
+    if _index_is_valid(registry, (schema_dir, root, index_sig), idx_artifact):
+        emit(idx_artifact)
+
+    # --- B) Choose parse targets (cached across pages of the same run) ---
+    targets_key = (root, index_sig, use_source_index, tuple(sorted(allow_paths)))
+    cached_targets = _targets_get(targets_key)
+    if cached_targets is not None:
+        targets_all, copy_dirs_abs, copy_fp = cached_targets
     else:
-        targets_all = list(filter_paths(walk_sources(root), allow_paths))
+        targets_all, copy_dirs_abs, copy_fp = _select_targets(root, index_data, use_source_index, allow_paths)
+        _targets_put(targets_key, (targets_all, copy_dirs_abs, copy_fp))
 
     total = len(targets_all)
     stats["files_total"] = total
 
     if start_at >= total:
         return {
-            "artifacts": artifacts,
+            "artifacts": head,
             "diagnostics": diagnostics,
             "stats": stats,
             "continuation": {"has_more": False, "next": start_at, "remaining": 0, "total": total},
         }
 
-    t0 = time.monotonic()
+    # budget_seconds counts from here; math.inf when disabled keeps checks branch-free
+    deadline = time.monotonic() + budget_seconds if budget_seconds else math.inf
     processed = 0
     emitted_programs = 0
     emitted_copybooks = 0
 
-    remaining_slice = targets_all[start_at:]
-    if file_limit > 0:
-        remaining_slice = remaining_slice[:file_limit]
-
-    for abs_p, rel_p, kind in remaining_slice:
-        if _shutdown or (budget_seconds and (time.monotonic() - t0) >= budget_seconds):
-            break
+    end = start_at + file_limit if file_limit > 0 else total
+    remaining_slice = _page_targets(targets_all[start_at:end], os.path.join(root, ""))
 
+    job_args = (dialect, debug_raw, raw_dump_dir, copy_dirs_abs, copy_fp, schema_dir)
+    for rel_p, artifact, diags, cache in _iter_deduped(remaining_slice, hints, job_args, deadline):
         stats["files_scanned"] += 1
         processed += 1
-
-        try:
-            with open(abs_p, "rb") as f:
-                raw = f.read()
-        except Exception as e:
-            diagnostics.append({"level": "warning", "relpath": rel_p, "message": f"Read error: {e}"})
-            continue
-
-        enc, payload = detect_encoding(raw)
-        try:
-            text = payload.decode(enc, errors="strict")
-        except Exception as e:
-            diagnostics.append({"level": "warning", "relpath": rel_p, "message": f"Decode failed ({enc}): {e}"})
+        if cache == CACHE_REUSED:
+            stats["files_reused_from_cache"] += 1
+            stats["cache_hits"] += 1
+        elif cache == CACHE_HIT:
+            stats["cache_hits"] += 1
+        elif cache == CACHE_MISS:
+            stats["cache_misses"] += 1
+        elif cache == DEDUPED:
+            stats["files_deduplicated"] += 1
+        diagnostics.extend(diags)
+        if artifact is None:
             continue
-
-        content_hash = sha256_bytes(payload)
-
-        if kind == "cobol":
-            ast = adapter.parse_program(text, rel_p, dialect, debug_raw, raw_dump_dir, copy_dirs_abs)
-            data = normalize_program(ast, relpath=rel_p, sha256=content_hash)
-            artifact = {"kind": "cam.cobol.program", "version": "1.0.0", "body": data}
-            if not registry.validate(artifact):
-                emitted_programs += 1
-                artifacts.append(artifact)
-
-        elif kind == "copybook":
-            ast = adapter.parse_copybook(text, rel_p, dialect, debug_raw, raw_dump_dir)
-            data = normalize_copybook(ast, relpath=rel_p, sha256=content_hash)
-            artifact = {"kind": "cam.cobol.copybook", "version": "1.0.0", "body": data}
-            if not registry.validate(artifact):
-                emitted_copybooks += 1
-                artifacts.append(artifact)
+        if artifact["kind"] == "cam.cobol.program":
+            emitted_programs += 1
+        else:
+            emitted_copybooks += 1
+        emit(artifact)
 
     stats["programs_emitted"] = emitted_programs
     stats["copybooks_emitted"] = emitted_copybooks
@@ -276,13 +731,7 @@ def parse_tree(inp: Dict[str, Any]) -> Dict[str, Any]:
         "total": total,
     }
 
-    def _sort_key(a: Dict[str, Any]) -> Tuple[str, str, str]:
-        body = a.get("body", {}) or {}
-        rel = (body.get("source") or {}).get("relpath", "")
-        name = body.get("program_id") or body.get("name") or ""
-        return (a.get("kind", ""), rel, name)
-
-    artifacts.sort(key=_sort_key)
+    artifacts = head + copybooks + programs
 
     # Return the *full* result to callers (useful if someone wants stats/diags),
     # but keep the MCP envelope small by only placing artifacts under structuredContent.
@@ -294,42 +743,113 @@ def parse_tree(inp: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 # ------------------------------ Protocol --------------------------------
+def _dumps_line(obj: Dict[str, Any]) -> bytes:
+    # one buffer per message: newline appended by orjson, single write
+    return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
 def _send(obj: Dict[str, Any]) -> None:
     # IMPORTANT: stdout is *only* for JSON-RPC
-    sys.stdout.write(json.dumps(obj, separators=(",", ":")) + "\n")
-    sys.stdout.flush()
+    out = sys.stdout.buffer
+    out.write(_dumps_line(obj))
+    out.flush()
+
+def _loads(line: str | bytes) -> Any:
+    return orjson.loads(line)
+
+# Incoming JSON-RPC message, decoded once at ingress; handlers read attributes.
+# Fields are typed loosely so a malformed member never loses the message (and
+# its id); `_invalid_msg` checks them and normalizes params.
+if msgspec is not None:
+    class RpcMsg(msgspec.Struct):
+        id: Any = None
+        method: Any = ""
+        params: Any = None
+
+    _RPC_DECODER = msgspec.json.Decoder(RpcMsg)
+else:
+    @dataclass(slots=True)
+    class RpcMsg:  # type: ignore[no-redef]
+        id: Any = None
+        method: Any = ""
+        params: Any = None
+
+    _RPC_DECODER = None
+
+def _decode_msg(line: bytes) -> RpcMsg:
+    """Decode one request line; raises ValueError for non-JSON or non-object input."""
+    if _RPC_DECODER is not None:
+        return _RPC_DECODER.decode(line)
+    msg = _loads(line)
+    if not isinstance(msg, dict):
+        raise ValueError("JSON-RPC message must be an object")
+    return RpcMsg(msg.get("id"), msg.get("method", ""), msg.get("params"))
+
+def _invalid_msg(msg: RpcMsg) -> Tuple[int, str] | None:
+    """(code, message) for a request the handlers cannot take; else None, with params made a dict."""
+    if not isinstance(msg.method, str):
+        return -32600, "Invalid Request: method must be a string"
+    if msg.params is None:
+        msg.params = {}
+    elif not isinstance(msg.params, dict):
+        return -32602, "Invalid params: params must be an object"
+    return None
 
 def _send_error(id_val: Any, code: int, message: str, data: Dict[str, Any] | None = None) -> None:
     _send({"jsonrpc": "2.0", "id": id_val, "error": {"code": code, "message": message, "data": data or {}}})
 
-def _handle_initialize(msg: Dict[str, Any]) -> None:
+def _handle_initialize(msg: RpcMsg) -> None:
     result = {
         "protocolVersion": "0.1",
         "serverInfo": {"name": "mcp.cobol.parser", "version": "0.0.2"},
         "capabilities": {"tools": {}},
     }
-    _send({"jsonrpc": "2.0", "id": msg.get("id"), "result": result})
+    _send({"jsonrpc": "2.0", "id": msg.id, "result": result})
 
-def _handle_initialized(_msg: Dict[str, Any]) -> None:
+def _handle_initialized(_msg: RpcMsg) -> None:
     return
 
-def _handle_shutdown(msg: Dict[str, Any]) -> None:
-    _send({"jsonrpc": "2.0", "id": msg.get("id"), "result": None})
+def _handle_shutdown(msg: RpcMsg) -> None:
+    _send({"jsonrpc": "2.0", "id": msg.id, "result": None})
 
-def _handle_tools_list(msg: Dict[str, Any]) -> None:
-    _send({"jsonrpc": "2.0", "id": msg.get("id"), "result": list_tools()})
+def _handle_tools_list(msg: RpcMsg) -> None:
+    _send({"jsonrpc": "2.0", "id": msg.id, "result": list_tools()})
 
-def _handle_tools_call(msg: Dict[str, Any]) -> None:
-    params = msg.get("params") or {}
+def _handle_tools_call(msg: RpcMsg) -> None:
+    params = msg.params
     name = params.get("name")
     arguments = params.get("arguments") or {}
 
     if name != "parse_tree":
-        _send_error(msg.get("id"), -32601, f"Unknown tool: {name}")
+        _send_error(msg.id, -32601, f"Unknown tool: {name}")
         return
 
+    stream = bool(arguments.get("stream", False))
+    ndjson = bool(arguments.get("ndjson", False)) and not stream
+    emit_cb: Callable[[Dict[str, Any]], None] | None = None
+    sink: BinaryIO | None = None
+    ndjson_path = ""
+    ndjson_count = 0
+
+    if stream:
+        def emit_cb(art: Dict[str, Any]) -> None:
+            _send({"jsonrpc": "2.0", "method": "notifications/artifact",
+                   "params": {"id": msg.id, "artifact": art}})
+
     try:
-        res = parse_tree(arguments)  # {artifacts, diagnostics, stats, continuation}
+        if ndjson:
+            fd, ndjson_path = tempfile.mkstemp(
+                prefix="parse_", suffix=".ndjson", dir=os.environ.get("ARTIFACTS_NDJSON_DIR") or None
+            )
+            sink = os.fdopen(fd, "wb")
+
+            def emit_cb(art: Dict[str, Any]) -> None:
+                nonlocal ndjson_count
+                sink.write(_dumps_line(art))
+                ndjson_count += 1
+
+        res = parse_tree(arguments, emit_cb=emit_cb)  # {artifacts, diagnostics, stats, continuation}
+        if sink is not None:
+            sink.close()
 
         # tiny human summary only (keeps stdout small & safe)
         st = res.get("stats", {})
@@ -342,11 +862,20 @@ def _handle_tools_call(msg: Dict[str, Any]) -> None:
         )
 
         # IMPORTANT: mirror working git MCP: artifacts reside in structuredContent.artifacts
-        payload = {"artifacts": res.get("artifacts", [])}
+        payload: Dict[str, Any] = {"artifacts": res.get("artifacts", [])}
+        if ndjson:
+            payload.update({"artifacts_ndjson_path": ndjson_path, "artifacts_count": ndjson_count})
+        if stream or ndjson:
+            # artifacts already went out as notifications/artifact or to the NDJSON file
+            payload.update({
+                "stats": res.get("stats", {}),
+                "diagnostics": res.get("diagnostics", []),
+                "continuation": res.get("continuation", {}),
+            })
 
         _send({
             "jsonrpc": "2.0",
-            "id": msg.get("id"),
+            "id": msg.id,
             "result": {
                 "content": [{"type": "text", "text": summary}],
                 "structuredContent": payload,
@@ -355,45 +884,62 @@ def _handle_tools_call(msg: Dict[str, Any]) -> None:
         })
 
     except Exception as e:
+        if sink is not None:
+            sink.close()
+            try:
+                os.remove(ndjson_path)
+            except OSError:
+                pass
         # Errors still go via result with isError=True (per your client expectations)
         _send({
             "jsonrpc": "2.0",
-            "id": msg.get("id"),
+            "id": msg.id,
             "result": {"content": [{"type": "text", "text": str(e)}], "isError": True},
         })
 
+_HANDLERS: Dict[str, Callable[[RpcMsg], None]] = {
+    "initialize": _handle_initialize,
+    "notifications/initialized": _handle_initialized,
+    "shutdown": _handle_shutdown,
+    "tools/list": _handle_tools_list,
+    "tools/call": _handle_tools_call,
+}
+
 def run_stdio_loop() -> None:
     print("mcp server ready", file=sys.stderr, flush=True)
-    for line in sys.stdin:
+    # Binary readline blocks until a full line or EOF; no text-layer decode.
+    # The decoders skip surrounding whitespace, so the line goes in as read.
+    stdin = sys.stdin.buffer
+    while not _shutdown.is_set():
+        line = stdin.readline()
         if not line:
-            time.sleep(0.01)
-            continue
+            break
         try:
-            msg = json.loads(line.strip())
-        except json.JSONDecodeError:
+            msg = _decode_msg(line)
+        except ValueError:
             # ignore non-JSON garbage on stdin
             continue
-        method = msg.get("method")
-        if method == "initialize":
-            _handle_initialize(msg)
-        elif method == "notifications/initialized":
-            _handle_initialized(msg)
-        elif method == "shutdown":
-            _handle_shutdown(msg)
-        elif method == "tools/list":
-            _handle_tools_list(msg)
-        elif method == "tools/call":
-            _handle_tools_call(msg)
-        elif method == "exit":
+        err = _invalid_msg(msg)
+        if err is not None:
+            if msg.id is not None:
+                _send_error(msg.id, *err)
+            continue
+        handler = _HANDLERS.get(msg.method)
+        if handler is not None:
+            handler(msg)
+        elif msg.method == "exit":
             break
         else:
-            _send_error(msg.get("id"), -32601, f"Unknown method: {method}")
+            _send_error(msg.id, -32601, f"Unknown method: {msg.method}")
 
 def main(argv: List[str] | None = None) -> int:
     ap = argparse.ArgumentParser("cobol-parser-mcp")
     ap.add_argument("--stdio", action="store_true")
     _ = ap.parse_args(argv)
-    run_stdio_loop()
+    try:
+        run_stdio_loop()
+    finally:
+        _shutdown_workers()
     return 0
 
 if __name__ == "__main__":
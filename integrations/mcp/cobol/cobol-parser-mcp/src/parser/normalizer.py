@@ -1,6 +1,15 @@
 # integrations/mcp/cobol/cobol-parser-mcp/src/parser/normalizer.py
 from __future__ import annotations
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Dict, List, Sequence
+
+def _sorted_unique(seq: Sequence[str] | None) -> List[str]:
+    """sorted(set(seq)), skipping the set + sort when seq is already strictly increasing."""
+    if not seq:
+        return []
+    if all(a < b for a, b in zip(seq, islice(seq, 1, None))):
+        return list(seq)
+    return sorted(set(seq))
 
 def normalize_program(ast: Dict[str, Any], relpath: str, sha256: str) -> Dict[str, Any]:
     """Map adapter AST → cam.cobol.program payload (strict shape)."""
@@ -8,20 +17,18 @@ def normalize_program(ast: Dict[str, Any], relpath: str, sha256: str) -> Dict[st
     # deterministic sorts
     paragraphs = sorted(paragraphs, key=lambda p: p.get("name", ""))
 
-    perf_sorted = []
-    out_paragraphs: List[Dict[str, Any]] = []
-    for p in paragraphs:
-        performs = sorted(list({*p.get("performs", [])}))
-        calls = p.get("calls") or []
-        io_ops = p.get("io_ops") or []
-        out_paragraphs.append({
+    # explicit shape: the schema rejects extra paragraph keys
+    out_paragraphs: List[Dict[str, Any]] = [
+        {
             "name": p.get("name", ""),
-            "performs": performs,
-            "calls": calls,
-            "io_ops": io_ops,
-        })
+            "performs": _sorted_unique(p.get("performs")),
+            "calls": p.get("calls") or [],
+            "io_ops": p.get("io_ops") or [],
+        }
+        for p in paragraphs
+    ]
 
-    copybooks_used = sorted(list({*(ast.get("copybooks_used") or [])}))
+    copybooks_used = _sorted_unique(ast.get("copybooks_used"))
 
     return {
         "program_id": ast.get("program_id", ""),
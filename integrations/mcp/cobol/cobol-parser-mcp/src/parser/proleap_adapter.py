@@ -1,83 +1,339 @@
 # integrations/mcp/cobol/cobol-parser-mcp/src/parser/proleap_adapter.py
 from __future__ import annotations
 
-import json
+import glob
+import hashlib
 import os
 import re
 import subprocess
 import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from functools import lru_cache
+from bisect import bisect_right
+from itertools import islice
+
+import orjson
+
+from src.utils import parse_cache
+
+try:
+    from lxml import etree as _lxml_etree  # type: ignore  # faster XML parsing (optional)
+except Exception:
+    _lxml_etree = None
+
+try:
+    import hyperscan  # type: ignore  # SIMD multi-literal scanner (optional)
+except Exception:
+    hyperscan = None
+
+try:
+    import numpy as np  # type: ignore  # vectorized label-line prefilter (optional)
+except Exception:
+    np = None
+
+try:
+    from numba import njit  # type: ignore  # compiled offset->block assignment (optional)
+except Exception:
+    njit = None
 
 # --- simple regex fallbacks / scanners ---
 _PROGRAM_ID_RE = re.compile(r"^\s*PROGRAM-ID\.\s+([A-Za-z0-9_-]+)\s*\.?", re.IGNORECASE | re.MULTILINE)
 # Label line: paragraph name followed by a period on its own line (area A/B tolerant)
 _PARA_LABEL_RE  = re.compile(r"(?m)^(?P<indent>\s{0,8})(?P<name>[A-Za-z0-9][A-Za-z0-9-]*)\s*\.\s*$")
-# Statement finders used inside blocks
-_PERFORM_RE     = re.compile(r"\bPERFORM\s+([A-Za-z0-9][A-Za-z0-9-]*)\b", re.IGNORECASE)
-_CALL_RE        = re.compile(r"\bCALL\s+(?:\"|')?([A-Za-z0-9][A-Za-z0-9-]*)(?:\"|')?\b", re.IGNORECASE)
+# COPY statement, per line (COPY expansion)
 _COPY_RE        = re.compile(r"\bCOPY\s+([A-Za-z0-9][A-Za-z0-9-]*)\b", re.IGNORECASE)
-_IO_RE          = re.compile(r"\b(OPEN|CLOSE|READ|WRITE|REWRITE|DELETE|START)\b", re.IGNORECASE)
+# Statement finder: PERFORM / CALL / COPY / io verbs in one pass. The first three
+# are lookaheads and consume nothing, so io verbs are still seen inside them
+# (e.g. READ in `PERFORM READ-FILE`), as separate per-kind scans would.
+_STMT_RE        = re.compile(
+    r"(?=\bPERFORM\s+(?P<perf>[A-Za-z0-9][A-Za-z0-9-]*)\b)"
+    r"|(?=\bCALL\s+(?:\"|')?(?P<call>[A-Za-z0-9][A-Za-z0-9-]*)(?:\"|')?\b)"
+    r"|(?=\bCOPY\s+(?P<copy>[A-Za-z0-9][A-Za-z0-9-]*)\b)"
+    r"|\b(?P<io>OPEN|CLOSE|READ|WRITE|REWRITE|DELETE|START)\b",
+    re.IGNORECASE,
+)
+
+# ASCII-mode twins of the scanners run over whole programs. Unicode case folding
+# makes the str engine about twice as slow; on ASCII text without \x1c-\x1f
+# (which str-mode \s also matches) both modes give the same matches.
+_UNIT_SEPS = "\x1c\x1d\x1e\x1f"
+
+def _ascii_twin(p: re.Pattern) -> re.Pattern:
+    return re.compile(p.pattern, (p.flags & ~re.UNICODE) | re.ASCII)
+
+def _plain_ascii(text: str) -> bool:
+    # four memchr-backed `in` tests beat one character-class regex scan
+    return text.isascii() and not any(sep in text for sep in _UNIT_SEPS)
+
+_STMT_RE_A       = _ascii_twin(_STMT_RE)
+_PARA_LABEL_RE_A = _ascii_twin(_PARA_LABEL_RE)
+_COPY_RE_A       = _ascii_twin(_COPY_RE)
+
+# Hyperscan prefilter: leftmost offsets of the keywords every _STMT_RE alternative
+# starts with. It has no lookaheads or captures, so it only proposes positions.
+_STMT_KEYWORDS = [rb"\bPERFORM\b", rb"\bCALL\b", rb"\bCOPY\b", rb"\b(?:OPEN|CLOSE|READ|WRITE|REWRITE|DELETE|START)\b"]
+
+@lru_cache(maxsize=1)
+def _stmt_db() -> Any:
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=_STMT_KEYWORDS,
+            ids=list(range(len(_STMT_KEYWORDS))),
+            elements=len(_STMT_KEYWORDS),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_STMT_KEYWORDS),
+        )
+        return db
+    except Exception:
+        return None
 
-# Division sentinels
-_DIV_IDENT   = re.compile(r"(?im)^\s*IDENTIFICATION\s+DIVISION\.", re.MULTILINE)
-_DIV_ENV     = re.compile(r"(?im)^\s*ENVIRONMENT\s+DIVISION\.", re.MULTILINE)
-_DIV_DATA    = re.compile(r"(?im)^\s*DATA\s+DIVISION\.", re.MULTILINE)
-_DIV_PROC    = re.compile(r"(?im)^\s*PROCEDURE\s+DIVISION\.", re.MULTILINE)
+# Plain-text form of the same keywords, for the str.find prefilter
+_STMT_WORDS = ("PERFORM", "CALL", "COPY", "OPEN", "CLOSE", "READ", "WRITE", "REWRITE", "DELETE", "START")
+
+def _keyword_offsets(upper: str) -> List[int]:
+    # no keyword is a prefix of another, so no offset is found twice
+    offs: List[int] = []
+    for word in _STMT_WORDS:
+        i = upper.find(word)
+        while i != -1:
+            offs.append(i)
+            i = upper.find(word, i + 1)
+    offs.sort()
+    return offs
+
+def _stmt_hits(text: str, folded: bool = False) -> Iterator[re.Match]:
+    """
+    `_STMT_RE.finditer(text)`. Only keyword offsets are tried (from hyperscan, or
+    `str.find` on the upper-cased text), so the Python regex engine no longer
+    steps through every character; a match at each offset still checks the
+    word boundaries. Byte, upper-cased and original offsets only agree for
+    ASCII text; anything else takes the plain finditer path. `folded` says
+    `text` is already upper-cased.
+    """
+    plain = _plain_ascii(text)
+    rx = _STMT_RE_A if plain else _STMT_RE
+    db = _stmt_db()
+    if db is None:
+        if not plain:
+            yield from rx.finditer(text)
+            return
+        for pos in _keyword_offsets(text if folded else text.upper()):
+            m = rx.match(text, pos)
+            if m is not None:
+                yield m
+        return
+    if not text.isascii():
+        yield from rx.finditer(text)
+        return
+    starts: List[int] = []
+    try:
+        db.scan(text.encode("ascii"), match_event_handler=lambda _id, frm, _to, _fl, _ctx: starts.append(frm))
+    except Exception:
+        yield from rx.finditer(text)
+        return
+    for pos in sorted(set(starts)):
+        m = rx.match(text, pos)
+        if m is not None:
+            yield m
+
+# Division sentinels, all four in one pattern; bit per division in _DIV_BITS order
+_DIV_ANY     = re.compile(r"(?im)^\s*(IDENTIFICATION|ENVIRONMENT|DATA|PROCEDURE)\s+DIVISION\.")
+_ASCII_BLANKS = " \t\n\r\x0b\x0c"
+_DIV_BITS    = {"IDENTIFICATION": 1, "ENVIRONMENT": 2, "DATA": 4, "PROCEDURE": 8}
+
+# Copybook texts (and misses) by path, with the (mtime_ns, size) they were read
+# at so an edited copybook is re-read; oldest evicted first once the cached text
+# exceeds COPY_CACHE_BYTES (default 64 MiB).
+_COPY_CACHE: Dict[str, Tuple[Tuple[int, int], Optional[str]]] = {}
+_COPY_CACHE_LOCK = threading.Lock()
+_copy_cache_bytes = 0
+
+def _copy_cache_budget() -> int:
+    try:
+        return int(os.environ.get("COPY_CACHE_BYTES", "") or 64 * 1024 * 1024)
+    except ValueError:
+        return 64 * 1024 * 1024
 
-@lru_cache(maxsize=1024)
-def _read_copy_candidate(abs_path: str) -> Optional[str]:
+def _clear_copy_cache() -> None:
+    global _copy_cache_bytes
+    with _COPY_CACHE_LOCK:
+        _COPY_CACHE.clear()
+        _copy_cache_bytes = 0
+
+def _load_copy_text(abs_path: str) -> Optional[str]:
+    """
+    One binary read and one decode, with the newline translation text mode
+    would have applied.
+    """
     try:
-        with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
+        with open(abs_path, "rb") as f:
+            s = f.read().decode("utf-8", "ignore")
     except Exception:
         return None
+    if "\r" in s:
+        s = s.replace("\r\n", "\n").replace("\r", "\n")
+    return s
+
+def _read_copy_candidate(abs_path: str) -> Optional[str]:
+    global _copy_cache_bytes
+    try:
+        st = os.stat(abs_path)
+    except OSError:
+        return None
+    # stamped before the read: a file changing mid-read is simply read again next time
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _COPY_CACHE_LOCK:
+        hit = _COPY_CACHE.get(abs_path)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+    s = _load_copy_text(abs_path)
+    budget = _copy_cache_budget()
+    with _COPY_CACHE_LOCK:
+        old = _COPY_CACHE.pop(abs_path, None)
+        if old is not None:
+            _copy_cache_bytes -= len(old[1] or "")
+        _COPY_CACHE[abs_path] = (stamp, s)
+        _copy_cache_bytes += len(s or "")
+        while _copy_cache_bytes > budget and _COPY_CACHE:
+            _copy_cache_bytes -= len(_COPY_CACHE.pop(next(iter(_COPY_CACHE)))[1] or "")
+    return s
+
+_COPY_EXTS = (".cpy", ".CPY", ".copy", ".COPY")
+
+@lru_cache(maxsize=256)
+def _dir_file_names(path: str, _mtime_ns: int) -> frozenset:
+    # keyed on the directory mtime, so added or removed copybooks are picked up
+    try:
+        with os.scandir(path) as it:
+            return frozenset(e.name for e in it if e.is_file())
+    except OSError:
+        return frozenset()
+
+@lru_cache(maxsize=64)
+def _copy_index(stamps: Tuple[Tuple[str, int], ...]) -> Dict[str, Tuple[str, ...]]:
+    # COPY name -> existing candidate paths, in dir order, then _COPY_EXTS order
+    index: Dict[str, List[str]] = {}
+    for d, mtime_ns in stamps:
+        names = _dir_file_names(d, mtime_ns)
+        for ext in _COPY_EXTS:
+            for fn in names:
+                if fn.endswith(ext) and len(fn) > len(ext):
+                    index.setdefault(fn[:-len(ext)], []).append(os.path.join(d, fn))
+    return {name: tuple(paths) for name, paths in index.items()}
+
+def _copy_candidates(copy_dirs: List[str]) -> Dict[str, Tuple[str, ...]]:
+    """
+    One stat per copy dir per expansion instead of an open per candidate path;
+    the name index is only rebuilt when one of the dirs changed.
+    """
+    stamps: List[Tuple[str, int]] = []
+    for d in copy_dirs:
+        try:
+            stamps.append((d, os.stat(d).st_mtime_ns))
+        except OSError:
+            continue
+    return _copy_index(tuple(stamps))
+
+# str.splitlines() boundaries that can occur in plain-ASCII text
+_ASCII_BREAK = re.compile(r"\r\n|[\n\r\x0b\x0c]")
+
+def _copy_lines(text: str, upper: str) -> Iterator[Tuple[int, str]]:
+    """
+    (offset, line) for each line of plain-ASCII `text` containing `COPY` in any
+    case, terminator included: the `splitlines(keepends=True)` lines a COPY
+    statement can be on, found without splitting the whole text.
+    """
+    i = upper.find("COPY")
+    end = 0
+    while i != -1:
+        # the previous line yielded ended at a line start, so look back no further
+        start = max(end, max(text.rfind(c, end, i) for c in "\n\r\x0b\x0c") + 1)
+        m = _ASCII_BREAK.search(text, i)
+        end = m.end() if m else len(text)
+        yield start, text[start:end]
+        i = upper.find("COPY", end)
+
+def _offset_lines(text: str) -> Iterator[Tuple[int, str]]:
+    pos = 0
+    for ln in text.splitlines(keepends=True):
+        yield pos, ln
+        pos += len(ln)
 
 def _expand_copys(text: str, relpath: str, copy_dirs: List[str]) -> str:
     """
     Very small include preprocessor for `COPY NAME.` lines.
     Supports bare `COPY NAME.` lines. Does NOT implement REPLACING.
+    Returns `text` itself when nothing was included.
     """
     if not copy_dirs:
         return text
+    # every _COPY_RE hit contains the literal, and a bulk upper() + find is a
+    # fraction of a regex pass, so most programs are ruled out before splitting
+    upper = text.upper()
+    if "COPY" not in upper:
+        return text
 
-    lines = text.splitlines(keepends=True)
+    # jumping between COPY lines costs a few times a plain per-line step, so it
+    # only pays when they are a small share of the lines
+    plain = _plain_ascii(text)
+    copy_rx = _COPY_RE_A if plain else _COPY_RE
+    if plain and upper.count("COPY") * 4 < text.count("\n"):
+        lines: Iterable[Tuple[int, str]] = _copy_lines(text, upper)
+    else:
+        # every line; also the only safe walk outside ASCII, where upper() may change lengths
+        lines = _offset_lines(text)
+
+    # untouched stretches of `text` and included bodies, joined once at the end
     out: List[str] = []
-    for ln in lines:
-        m = _COPY_RE.search(ln)
-        if m and ln.strip().upper().endswith("."):
-            name = m.group(1)
-            # try NAME.cpy / NAME.CPY / NAME.copy / NAME.COPY
-            candidates: List[str] = []
-            for d in copy_dirs:
-                for ext in (".cpy", ".CPY", ".copy", ".COPY"):
-                    candidates.append(os.path.join(d, f"{name}{ext}"))
-            included = None
-            for c in candidates:
-                s = _read_copy_candidate(c)
-                if s is not None:
-                    included = s
-                    break
+    last = 0
+    candidates: Optional[Dict[str, Tuple[str, ...]]] = None
+    for start, ln in lines:
+        m = copy_rx.search(ln)
+        if not m or not ln.strip().upper().endswith("."):
+            continue
+        name = m.group(1)
+        if candidates is None:
+            candidates = _copy_candidates(copy_dirs)
+        # try NAME.cpy / NAME.CPY / NAME.copy / NAME.COPY, only where the file exists
+        included = None
+        for path in candidates.get(name, ()):
+            included = _read_copy_candidate(path)
             if included is not None:
-                # naive include; retain a marker comment for dumps
-                out.append(f"      *COPY {name}*.\n")
-                out.append(included if included.endswith("\n") else included + "\n")
-                continue
-        out.append(ln)
+                break
+        if included is not None:
+            # naive include; retain a marker comment for dumps
+            out.append(text[last:start])
+            out.append(f"      *COPY {name}*.\n")
+            out.append(included if included.endswith("\n") else included + "\n")
+            last = start + len(ln)
+    if not out:
+        return text
+    out.append(text[last:])
     return "".join(out)
 
 # --- neutralize unsupported EXEC blocks for ProLeap (IMS, DLI, etc.) ---
-_EXEC_BLOCKS = [
-    re.compile(r"(?is)^\s*EXEC\s+DLI\b.*?END-EXEC\s*\.", re.MULTILINE),
-    re.compile(r"(?is)^\s*EXEC\s+IMS\b.*?END-EXEC\s*\.", re.MULTILINE),
-]
+# One alternation, so sanitizing is a single pass over the program.
+_EXEC_BLOCK   = re.compile(r"(?ims)^\s*EXEC\s+(?:DLI|IMS)\b.*?END-EXEC\s*\.")
+_EXEC_BLOCK_A = _ascii_twin(_EXEC_BLOCK)
+
+def _has_unsupported_exec(src: str, tool_out: str = "") -> bool:
+    up_src, up_out = src.upper(), tool_out.upper()
+    if "EXEC DLI" in up_src or "EXEC IMS" in up_src or \
+            "EXEC DLI" in up_out or "EXEC IMS" in up_out:
+        return True
+    # every block starts with the literal; rule most programs out before a regex pass
+    if "EXEC" not in up_src:
+        return False
+    return (_EXEC_BLOCK_A if _plain_ascii(src) else _EXEC_BLOCK).search(src) is not None
+
 def _neutralize_unsupported_execs(src: str) -> str:
-    out = src
-    for pat in _EXEC_BLOCKS:
-        out = pat.sub("    CONTINUE.", out)
-    return out
+    return (_EXEC_BLOCK_A if _plain_ascii(src) else _EXEC_BLOCK).sub("    CONTINUE.", src)
 
 def _should_dump(dump_raw_flag: bool) -> bool:
     # If RAW_AST_DUMP_DIR is set, dump even if caller didn't pass dump_raw=True.
@@ -88,77 +344,416 @@ def _dump_path_for(relpath: str, tool: str, suffix: str) -> Path:
     safe_rel = relpath.strip("/").replace("\\", "/")
     return Path(root) / f"{safe_rel}.{tool}{suffix}"
 
+def _xml_dump_path(tool: str, src: str, dialect: str, tool_version: str) -> Path:
+    # Content-addressed: the same tool input and tool build map to the same file.
+    root = os.environ.get("RAW_AST_DUMP_DIR") or "/tmp/proleap_raw"
+    h = hashlib.sha256(f"{tool_version}\0{dialect}\0{src}".encode("utf-8", "replace")).hexdigest()
+    return Path(root) / tool / h[:2] / f"{h}.xml"
+
+def _read_dump(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8")
+    except Exception:
+        return None
+
+# Dump dirs known to exist (as str: cheaper to hash than Path); a dir removed
+# behind our back is recreated on the failed write.
+_KNOWN_DIRS: set = set()
+
 def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+    parent = os.path.dirname(path)
+    if parent not in _KNOWN_DIRS:
+        os.makedirs(parent, exist_ok=True)
+        _KNOWN_DIRS.add(parent)
 
-def _dump_text(path: Path, content: str) -> None:
+def _write_dump(path: Path, data: bytes) -> None:
     _ensure_parent(path)
-    path.write_text(content, encoding="utf-8", errors="replace")
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+    except FileNotFoundError:
+        _KNOWN_DIRS.discard(os.path.dirname(path))
+        _ensure_parent(path)
+        tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _dump_text(path: Path, content: str) -> None:
+    _write_dump(path, content.encode("utf-8", errors="replace"))
 
 def _dump_json(path: Path, obj: Any) -> None:
-    _ensure_parent(path)
-    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_dump(path, orjson.dumps(obj, option=orjson.OPT_INDENT_2))
 
 def _normalize_io_ops(tokens: List[str]) -> List[Dict[str, Any]]:
     # Shape for schema: {"op": "...", "dataset_ref": "", "fields": []}
     return [{"op": tok.upper(), "dataset_ref": "", "fields": []} for tok in tokens]
 
 # --------- enrichment from raw source: blocks, edges, divisions ----------
-def _paragraph_blocks(text: str) -> List[Tuple[str, int, int]]:
+# A label match starts at a line whose leading whitespace (at most 8 chars, as
+# `\s{0,8}` allows) is followed by an alphanumeric, so only such lines need the
+# regex. Lookup tables are ASCII; `\s` there also covers \x1c-\x1f.
+_PARA_SCAN_MIN = 64 * 1024
+if np is not None:
+    _WS_TABLE = np.array([chr(i).isspace() for i in range(256)], dtype=bool)
+    _ALNUM_TABLE = np.array([i < 128 and chr(i).isalnum() for i in range(256)], dtype=bool)
+
+def _label_hits(text: str) -> Iterator[re.Match]:
+    """
+    `_PARA_LABEL_RE.finditer(text)`. With numpy and a large ASCII text, line
+    starts are screened in one vectorized pass and the regex is only tried at
+    the few candidates; skipping those inside the previous match keeps the
+    non-overlapping finditer semantics.
+    """
+    rx = _PARA_LABEL_RE_A if _plain_ascii(text) else _PARA_LABEL_RE
+    if np is None or len(text) < _PARA_SCAN_MIN or not text.isascii():
+        yield from rx.finditer(text)
+        return
+    arr = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    starts = np.concatenate(([0], np.flatnonzero(arr == 10) + 1))
+    padded = np.concatenate((arr, np.zeros(9, dtype=np.uint8)))
+    window = padded[starts[:, None] + np.arange(9)]
+    solid = ~_WS_TABLE[window]
+    first = solid.argmax(axis=1)
+    ok = solid.any(axis=1) & _ALNUM_TABLE[window[np.arange(len(starts)), first]]
+    last_end = 0
+    for pos in starts[ok].tolist():
+        if pos < last_end:
+            continue
+        m = rx.match(text, pos)
+        if m is not None:
+            last_end = m.end()
+            yield m
+
+@lru_cache(maxsize=128)
+def _paragraph_blocks(text: str) -> Tuple[Tuple[str, int, int], ...]:
     """
     Return ordered (NAME, start_idx, end_idx) blocks detected by paragraph labels.
-    If no labels, return a single MAIN block spanning full text.
+    If no labels, return a single MAIN block spanning full text. Memoized like
+    the analyzers below, so `_is_trivial` and `_edges_from_text` share one scan.
     """
     blocks: List[Tuple[str, int, int]] = []
-    matches = list(_PARA_LABEL_RE.finditer(text))
+    matches = list(_label_hits(text))
     if not matches:
-        return [("MAIN", 0, len(text))]
+        return (("MAIN", 0, len(text)),)
     for i, m in enumerate(matches):
         name = m.group("name").upper()
         start = m.start()
         end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
         blocks.append((name, start, end))
-    return blocks
+    return tuple(blocks)
+
+def _assign_blocks_py(offsets: List[int], starts: List[int]) -> List[int]:
+    return [bisect_right(starts, off) - 1 for off in offsets]
 
+_assign_blocks_nb: Optional[Callable[..., Any]] = None
+if njit is not None and np is not None:
+    try:
+        @njit(cache=True)
+        def _assign_blocks_nb(offsets, starts):  # type: ignore[no-redef]
+            # offsets ascend, so one forward walk over starts replaces a search per hit
+            out = np.empty(offsets.shape[0], dtype=np.int64)
+            j = -1
+            n = starts.shape[0]
+            for k in range(offsets.shape[0]):
+                while j + 1 < n and starts[j + 1] <= offsets[k]:
+                    j += 1
+                out[k] = j
+            return out
+    except Exception:
+        _assign_blocks_nb = None
+
+def _assign_blocks(offsets: List[int], starts: List[int]) -> List[int]:
+    """Index of the block each ascending offset falls in (-1 before the first block)."""
+    if _assign_blocks_nb is not None:
+        try:
+            return _assign_blocks_nb(np.asarray(offsets, dtype=np.int64), np.asarray(starts, dtype=np.int64)).tolist()
+        except Exception:
+            pass
+    return _assign_blocks_py(offsets, starts)
+
+@lru_cache(maxsize=128)
+def _division_bits(text: str) -> int:
+    """
+    Bitmap of the divisions `_DIV_ANY` finds. For plain ASCII text the scan is
+    led by the literal `DIVISION.`, found with `str.find` in the upper-cased text
+    (case-folding once and searching case-sensitively is far cheaper than an
+    IGNORECASE scan, and keeps ASCII offsets); each hit is then checked backwards:
+    blanks, a division name, and only blanks back to the start of its line (the
+    nearest line start is enough, since the leading blanks may only extend
+    further back).
+    """
+    seen = 0
+    if not _plain_ascii(text):
+        for m in _DIV_ANY.finditer(text):
+            seen |= _DIV_BITS[m.group(1).upper()]
+            if seen == 15:
+                break
+        return seen
+    upper = text.upper()
+    i = upper.find("DIVISION.")
+    while i != -1:
+        j = i
+        while j > 0 and upper[j - 1] in _ASCII_BLANKS:
+            j -= 1
+        if j < i:
+            for name, bit in _DIV_BITS.items():
+                s = j - len(name)
+                # no division name is a suffix of another, so at most one can match
+                if s >= 0 and upper.startswith(name, s):
+                    ls = upper.rfind("\n", 0, s) + 1
+                    if ls == s or upper[ls:s].isspace():
+                        seen |= bit
+                    break
+            if seen == 15:
+                break
+        i = upper.find("DIVISION.", i + 9)
+    return seen
+
+def skip_trivial_enabled() -> bool:
+    return os.environ.get("RENOVA_SKIP_TRIVIAL", "0").strip().lower() in ("1", "true", "yes")
+
+def _is_trivial(text: str) -> bool:
+    """No PROCEDURE DIVISION and at most one paragraph label: nothing for a parser to add."""
+    return not _division_bits(text) & _DIV_BITS["PROCEDURE"] and len(_paragraph_blocks(text)) < 2
+
+# The text analyzers are memoized on the text itself (str caches its own hash), so
+# the same program under another name is scanned once per process. Results are
+# shared between callers and must be treated as read-only.
+@lru_cache(maxsize=128)
 def _detect_divisions(text: str, program_id: Optional[str]) -> Dict[str, Any]:
     d: Dict[str, Any] = {"identification": {}, "environment": {}, "data": {}, "procedure": {}}
-    if _DIV_IDENT.search(text):
+    seen = _division_bits(text)
+    if seen & 1:
         if program_id:
             d["identification"]["program_id"] = program_id
         d["identification"]["present"] = True
-    if _DIV_ENV.search(text):  d["environment"]["present"] = True
-    if _DIV_DATA.search(text): d["data"]["present"] = True
-    if _DIV_PROC.search(text): d["procedure"]["present"] = True
+    if seen & 2: d["environment"]["present"] = True
+    if seen & 4: d["data"]["present"] = True
+    if seen & 8: d["procedure"]["present"] = True
     return d
 
-def _edges_from_text(text: str) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+# _STMT_RE group -> index of its set in the per-block (performs, calls, io) tuple
+_STMT_SLOT = {"perf": 0, "call": 1, "io": 2}
+
+def _sorted_small(names: set) -> List[str]:
+    # most blocks hold zero or one name per kind, which need no sort call
+    return list(names) if len(names) < 2 else sorted(names)
+
+@lru_cache(maxsize=128)
+def _edges_from_text(text: str) -> Tuple[List[Dict[str, Any]], List[str], List[str], List[str]]:
     """
-    Compute paragraph array with per-block performs/calls/io_ops,
-    plus rollups: all calls and all io tokens (as lists of strings for debug).
+    Compute paragraph array with per-block performs/calls/io_ops, plus rollups:
+    all calls and all io tokens (as lists of strings for debug) and the COPY
+    names in the whole text. One `_STMT_RE` pass; hits go to their block by offset,
+    assigned for all hits at once.
     """
     blocks = _paragraph_blocks(text)
-    all_calls: List[str] = []
-    all_io: List[str] = []
-    paragraphs: List[Dict[str, Any]] = []
+    starts = [s for _name, s, _e in blocks]
+    # per-block (performs, calls, io) sets, made on a block's first hit; most
+    # blocks of a large program have none
+    found: List[Optional[Tuple[set, set, set]]] = [None] * len(blocks)
+    copies = set()
+    # Per-kind end of the last accepted hit (reset per block), so hits of one kind
+    # never overlap, matching what a separate finditer per kind would return.
+    ends = {"perf": 0, "call": 0, "copy": 0, "io": 0}
+    cur = -1
+
+    # ASCII upper-casing keeps offsets, so plain text is scanned folded once
+    # and the captured names need no per-hit upper()
+    folded = _plain_ascii(text)
+    hits = list(_stmt_hits(text.upper(), True) if folded else _stmt_hits(text))
+    where = _assign_blocks([m.start() for m in hits], starts)
+
+    for m, i in zip(hits, where):
+        kind = m.lastgroup
+        if m.start() < ends[kind]:
+            continue
+        name = m.group(kind) if folded else m.group(kind).upper()
+        if kind == "copy":
+            copies.add(name)
+            ends["copy"] = m.end("copy")
+            continue
+        if i != cur:
+            cur = i
+            ends.update(perf=0, call=0, io=0)
+        # a statement only counts inside one block, as if each body were scanned alone
+        if i < 0 or m.end(kind) > blocks[i][2]:
+            continue
+        ends[kind] = m.end(kind)
+        sets = found[i]
+        if sets is None:
+            sets = found[i] = (set(), set(), set())
+        sets[_STMT_SLOT[kind]].add(name)
 
-    for name, s, e in blocks:
-        body = text[s:e]
-        performs = sorted({m.group(1).upper() for m in _PERFORM_RE.finditer(body)})
-        calls    = sorted({m.group(1).upper() for m in _CALL_RE.finditer(body)})
-        io_toks  = sorted({m.group(1).upper() for m in _IO_RE.finditer(body)})
-        all_calls.extend(calls)
-        all_io.extend(io_toks)
+    paragraphs: List[Dict[str, Any]] = []
+    for (name, _s, _e), sets in zip(blocks, found):
+        if sets is None:
+            paragraphs.append({"name": name, "performs": [], "calls": [], "io_ops": []})
+            continue
+        performs, calls, io_toks = sets
         paragraphs.append({
             "name": name,
-            "performs": performs,
-            "calls": [{"target": c, "dynamic": False} for c in calls],
-            "io_ops": _normalize_io_ops(io_toks),
+            "performs": _sorted_small(performs),
+            "calls": [{"target": c, "dynamic": False} for c in _sorted_small(calls)],
+            "io_ops": _normalize_io_ops(_sorted_small(io_toks)),
         })
 
     # de-dup rollups
-    all_calls = sorted(set(all_calls))
-    all_io    = sorted(set(all_io))
-    return paragraphs, all_calls, all_io
+    all_calls = sorted(set().union(*(f[1] for f in found if f is not None)))
+    all_io    = sorted(set().union(*(f[2] for f in found if f is not None)))
+    return paragraphs, all_calls, all_io, sorted(copies)
+
+# --------- tool XML parsing ----------
+_PROGRAM_ID_TAGS = ["program-id", "programId", "PROGRAM-ID"]
+_PARA_TAGS = ("paragraph", "Paragraph", "para", "paragraphName")
+_COPY_TAGS = ("copy", "copybook", "COPY")
+_PROGRAM_XML_TAGS = frozenset((*_PROGRAM_ID_TAGS, *_PARA_TAGS, *_COPY_TAGS))
+
+@lru_cache(maxsize=1)
+def _lxml_parser() -> Any:
+    # The text was already decoded, so its bytes are UTF-8 whatever the prolog says;
+    # entities stay unresolved like the stdlib parser's.
+    return _lxml_etree.XMLParser(encoding="utf-8", resolve_entities=False, no_network=True, huge_tree=True)
+
+def _parse_xml(xml_str: str) -> Optional[Any]:
+    """Root element of tool XML (lxml when installed, else ElementTree); None if malformed."""
+    if _lxml_etree is not None:
+        try:
+            return _lxml_etree.fromstring(xml_str.encode("utf-8"), parser=_lxml_parser())
+        except _lxml_etree.XMLSyntaxError:
+            return None
+    try:
+        return ET.fromstring(xml_str)
+    except ET.ParseError:
+        return None
+
+def _index_tags(root: Any, tags: frozenset) -> Dict[str, List[Any]]:
+    """
+    Descendants of `root` (not root itself) whose tag is in `tags`, by tag and in
+    document order: what `root.findall(f".//{tag}")` returns, from one tree walk.
+    lxml trees filter by tag in C, so other elements never become Python objects.
+    """
+    by_tag: Dict[str, List[Any]] = {}
+    if hasattr(root, "iterdescendants"):
+        els = root.iterdescendants(*tags)
+    else:
+        els = (el for el in islice(root.iter(), 1, None) if el.tag in tags)
+    for el in els:
+        by_tag.setdefault(el.tag, []).append(el)
+    return by_tag
+
+def _names_under(by_tag: Dict[str, List[Any]], tags: Tuple[str, ...]) -> set:
+    names = set()
+    for tag in tags:
+        for node in by_tag.get(tag, ()):
+            nm = (node.get("name") or (node.text or "")).strip()
+            if nm:
+                names.add(nm.upper())
+    return names
+
+# Bump when the XML → AST mapping changes so cached tool ASTs are not reused.
+_AST_CACHE_VERSION = "1"
+
+def _classpath_stamp(cp: str) -> str:
+    """Path + mtime + size of every classpath entry (Java `dir/*` wildcards expanded)."""
+    parts: List[str] = []
+    for entry in cp.split(os.pathsep):
+        for path in (sorted(glob.glob(entry)) if "*" in entry else [entry]):
+            try:
+                st = os.stat(path)
+                parts.append(f"{path}:{st.st_mtime_ns}:{st.st_size}")
+            except OSError:
+                parts.append(f"{path}:-")
+    return ";".join(parts)
+
+def _ast_key(kind: str, text: str, relpath: str, dialect: str, tool_version: str) -> str:
+    # names fall back to the basename, so it is part of the key
+    content_hash = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+    return parse_cache.make_key(content_hash, kind, dialect, os.path.basename(relpath), tool_version)
+
+@lru_cache(maxsize=8)
+def _java_env(dialect: str) -> Dict[str, str]:
+    """Child environment for the Java tools; shared, so never mutate the result."""
+    env = os.environ.copy()
+    env["COBOL_DIALECT"] = dialect
+    return env
+
+# What failed tool runs taught an adapter (no java, unloadable main classes) is
+# forgotten after this long, so one transient JVM start failure does not
+# disable ProLeap for the life of the server.
+_PROBE_RETRY_SECONDS = 300.0
+
+@lru_cache(maxsize=1)
+def _mem_tmpdir() -> Optional[str]:
+    d = "/dev/shm"
+    return d if os.path.isdir(d) and os.access(d, os.W_OK | os.X_OK) else None
+
+def _write_temp(data: bytes, prefix: str, suffix: str) -> str:
+    """
+    Temp input file for a tool that needs a path. The bridge and cb2xml want a
+    regular, re-readable file (no pipes), so it goes to tmpfs when there is one:
+    same file semantics, no disk round trip. Falls back to the default temp dir
+    (e.g. /dev/shm full). The caller removes it.
+    """
+    for d in (_mem_tmpdir(), None):
+        name = ""
+        try:
+            with tempfile.NamedTemporaryFile(prefix=prefix, suffix=suffix, dir=d, delete=False) as tmp:
+                name = tmp.name
+                tmp.write(data)
+            return name
+        except OSError:
+            if name:
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+            if d is None:
+                raise
+    raise OSError("no temp dir")
+
+def _java_timeout() -> Optional[float]:
+    # JAVA_TIMEOUT_SECONDS bounds one CLI tool run; 0 waits indefinitely
+    try:
+        t = float(os.environ.get("JAVA_TIMEOUT_SECONDS", "") or 300)
+    except ValueError:
+        t = 300.0
+    return t if t > 0 else None
+
+def _run_java(
+    cmd: List[str], env: Dict[str, str], stdin_bytes: Optional[bytes] = None, want_stderr: bool = True
+) -> Tuple[int, bytes, bytes]:
+    """
+    Run one CLI tool to completion and return (returncode, stdout, stderr).
+    stdout and stderr are separate pipes drained together by communicate(), so a
+    chatty tool cannot block on a full pipe; stderr goes to /dev/null unless
+    wanted. Without stdin_bytes the child gets /dev/null rather than our stdin,
+    which carries the JSON-RPC stream. Raises subprocess.TimeoutExpired.
+    """
+    with subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL if stdin_bytes is None else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if want_stderr else subprocess.DEVNULL,
+        env=env,
+    ) as proc:
+        try:
+            out, err = proc.communicate(stdin_bytes, timeout=_java_timeout())
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+    return proc.returncode, out, err or b""
+
+# JVM launcher message when the main class is not on the classpath
+_NO_MAIN_CLASS = b"Could not find or load main class"
+
+def _tool_log(cmd: List[str], rc: int, out: bytes, err: bytes) -> Tuple[str, str]:
+    """(stdout text, log entry) for one tool run, in the attempts-log format."""
+    s = out.decode("utf-8", errors="replace")
+    text = s + err.decode("utf-8", errors="replace") if err else s
+    if rc != 0:
+        return s, f"\n# {cmd} FAILED (exit {rc}):\n{text}\n"
+    return s, f"\n# {cmd}\n{text}\n"
 
 class ProLeapAdapter:
     """
@@ -167,7 +762,8 @@ class ProLeapAdapter:
 
     Debug dumps:
       - Set env RAW_AST_DUMP_DIR=/mnt/work/.renova/debug/raw-ast (or anywhere)
-      - Success XML → <relpath>.<tool>.xml
+      - Success XML → <tool>/<h[:2]>/<h>.xml, h = sha256 of (dialect, tool input);
+        an existing dump is reused instead of re-running the tool
       - If CLI output isn't XML, we still dump it as <relpath>.<tool>.txt
       - We also capture <relpath>.<tool>.attempts.json with the tried commands.
     """
@@ -175,6 +771,40 @@ class ProLeapAdapter:
     def __init__(self, jar_path: str | None = None) -> None:
         # kept for backwards compat; unused when we rely on classpaths
         self.jar_path = jar_path or os.environ.get("PROLEAP_JAR")
+        self._reset_probes()
+
+    def _reset_probes(self) -> None:
+        self._tool_version_str: Optional[str] = None
+        # What earlier CLI runs showed: no java on PATH, (classpath, main) pairs
+        # the JVM could not load, and the cb2xml / ProLeap invocations that last gave XML.
+        self._java_missing = False
+        self._dead_mains: set = set()
+        self._cb2xml_pick: Optional[Tuple[str, str, Tuple[str, ...]]] = None
+        self._proleap_pick: Optional[Tuple[str, Tuple[str, ...]]] = None
+        self._probed_since = time.monotonic()
+
+    def _refresh_probes(self) -> None:
+        """Start over on what tool runs showed once _PROBE_RETRY_SECONDS have passed."""
+        if time.monotonic() - self._probed_since >= _PROBE_RETRY_SECONDS:
+            self._reset_probes()
+
+    def shutdown(self) -> None:
+        """Release long-lived parser resources and forget tool probes. Safe to call more than once."""
+        _clear_copy_cache()
+        self._reset_probes()
+
+    def _tool_version(self) -> str:
+        """Fingerprint of the Java tools and settings behind an AST, for the AST cache."""
+        if self._tool_version_str is None:
+            proleap_cp, proleap_main, _env = self._proleap_launch("")
+            cb2xml_cp = os.environ.get("CB2XML_CLASSPATH", "").strip() or "/opt/cb2xml/lib/*"
+            raw = "|".join([
+                _AST_CACHE_VERSION, proleap_main, _classpath_stamp(proleap_cp),
+                os.environ.get("CB2XML_MAIN", ""), _classpath_stamp(cb2xml_cp),
+                os.environ.get("COBOL_SOURCE_FORMAT", ""),
+            ])
+            self._tool_version_str = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+        return self._tool_version_str
 
     # ------------------------- Public API -------------------------
 
@@ -185,84 +815,136 @@ class ProLeapAdapter:
         dialect: str,
         dump_raw: bool = False,
         dump_dir: Optional[str] = None,  # kept for API compatibility (unused; we prefer env)
-        copy_paths: Optional[List[str]] = None
+        copy_paths: Optional[List[str]] = None,
+        src_path: Optional[str] = None,
     ) -> Dict[str, Any]:
-        want_dump = _should_dump(dump_raw)
+        """
+        `src_path`, when given, is a file whose bytes are exactly `text` in UTF-8;
+        file-mode runs read it in place instead of writing a temp copy.
+        """
+        return self.parse_programs([(text, relpath, src_path)], dialect, dump_raw, dump_dir, copy_paths)[0]
 
+    def parse_programs(
+        self,
+        items: List[Tuple[str, str, Optional[str]]],
+        dialect: str,
+        dump_raw: bool = False,
+        dump_dir: Optional[str] = None,  # kept for API compatibility (unused; we prefer env)
+        copy_paths: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Batch form of `parse_program`; items are (text, relpath, src_path). ASTs a
+        Java tool produced are cached on disk by expanded text + tool version,
+        so unchanged programs skip the JVM. With RENOVA_SKIP_TRIVIAL=1, programs
+        `_is_trivial` accepts get the regex AST without any tool run.
+        """
+        want_dump = _should_dump(dump_raw)
+        self._refresh_probes()
+        prepared = [self._expand_program(text, relpath, copy_paths, src_path) for text, relpath, src_path in items]
+
+        keys: List[Optional[str]] = [None] * len(prepared)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prepared)
+        if not want_dump:
+            version = self._tool_version()
+            keys = [_ast_key("ast-program", text, relpath, dialect, version) for text, relpath, _src in prepared]
+            results = [parse_cache.get(k) for k in keys]
+        if skip_trivial_enabled():
+            for i, res in enumerate(results):
+                if res is None and _is_trivial(prepared[i][0]):
+                    results[i] = self._regex_program(prepared[i][0], prepared[i][1])
+        todo = [i for i, res in enumerate(results) if res is None]
+        for i in todo:
+            text, relpath, src_path = prepared[i]
+            ast, from_tool = self._parse_expanded(text, relpath, dialect, want_dump, src_path)
+            if from_tool and keys[i]:
+                parse_cache.put(keys[i], ast)
+            results[i] = ast
+        return results  # type: ignore[return-value]
+
+    def _expand_program(
+        self, text: str, relpath: str, copy_paths: Optional[List[str]], src_path: Optional[str]
+    ) -> Tuple[str, str, Optional[str]]:
         # Pre-expand simple COPY lines using source_index-derived dirs
         if copy_paths:
             try:
-                text = _expand_copys(text, relpath, copy_paths)
+                expanded = _expand_copys(text, relpath, copy_paths)
+                if expanded is not text:
+                    text, src_path = expanded, None
             except Exception:
                 pass
+        return text, relpath, src_path
 
+    def _parse_expanded(
+        self,
+        text: str,
+        relpath: str,
+        dialect: str,
+        want_dump: bool,
+        src_path: Optional[str],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """(ast, from_tool); from_tool is False for the regex-only fallback."""
         # --- Try ProLeap ---
-        xml_str, attempts, raw_out = self._run_proleap(text, dialect, relpath)
-        if want_dump:
-            _dump_json(_dump_path_for(relpath, "proleap", ".attempts.json"), attempts)
-            if xml_str:
-                _dump_text(_dump_path_for(relpath, "proleap", ".xml"), xml_str)
-            elif raw_out:
-                _dump_text(_dump_path_for(relpath, "proleap", ".txt"), raw_out)
+        xml_str, xml_path = self._run_dumped(
+            "proleap", lambda: self._run_proleap(text, dialect, relpath, src_path), text, dialect, relpath, want_dump
+        )
 
         if xml_str:
             ast = self._from_proleap_program(xml_str, relpath)
             if ast:
-                if want_dump:
-                    ast["_raw_dump_path"] = str(_dump_path_for(relpath, "proleap", ".xml"))
+                if xml_path:
+                    ast["_raw_dump_path"] = str(xml_path)
                 ast.pop("notes", None)
 
                 # Enrich edges & divisions from text
-                paragraphs, calls_all, io_all = _edges_from_text(text)
+                paragraphs, calls_all, io_all, txt_copy = _edges_from_text(text)
                 ast["paragraphs"] = paragraphs or ast.get("paragraphs") or [{"name": "MAIN", "performs": [], "calls": [], "io_ops": []}]
                 ast["divisions"] = _detect_divisions(text, ast.get("program_id"))
                 # supplement copybooks from text if any missed
-                txt_copy = self._find_copybooks(text)
                 if txt_copy:
                     ast["copybooks_used"] = sorted({*(ast.get("copybooks_used") or []), *txt_copy})
                 # debug rollups
                 ast["_calls_all"] = calls_all
                 ast["_io_ops_all"] = _normalize_io_ops(io_all)
-                return ast
+                return ast, True
 
         # --- Fallback: cb2xml (program) ---
-        xml_str, attempts, raw_out = self._run_cb2xml(text, dialect, relpath, is_copybook=False)
-        if want_dump:
-            _dump_json(_dump_path_for(relpath, "cb2xml_prog", ".attempts.json"), attempts)
-            if xml_str:
-                _dump_text(_dump_path_for(relpath, "cb2xml_prog", ".xml"), xml_str)
-            elif raw_out:
-                _dump_text(_dump_path_for(relpath, "cb2xml_prog", ".txt"), raw_out)
+        xml_str, xml_path = self._run_dumped(
+            "cb2xml_prog", lambda: self._run_cb2xml(
+                text, dialect, relpath, is_copybook=False, src_path=src_path, keep_output=want_dump
+            ),
+            text, dialect, relpath, want_dump,
+        )
 
         if xml_str:
             ast = self._from_cb2xml_program(xml_str, relpath)
             if ast:
-                if want_dump:
-                    ast["_raw_dump_path"] = str(_dump_path_for(relpath, "cb2xml_prog", ".xml"))
+                if xml_path:
+                    ast["_raw_dump_path"] = str(xml_path)
                 ast.pop("notes", None)
 
                 # Enrich edges & divisions from text
-                paragraphs, calls_all, io_all = _edges_from_text(text)
+                paragraphs, calls_all, io_all, txt_copy = _edges_from_text(text)
                 ast["paragraphs"] = paragraphs or ast.get("paragraphs") or [{"name": "MAIN", "performs": [], "calls": [], "io_ops": []}]
                 ast["divisions"] = _detect_divisions(text, ast.get("program_id"))
-                txt_copy = self._find_copybooks(text)
                 if txt_copy:
                     ast["copybooks_used"] = sorted({*(ast.get("copybooks_used") or []), *txt_copy})
                 ast["_calls_all"] = calls_all
                 ast["_io_ops_all"] = _normalize_io_ops(io_all)
-                return ast
+                return ast, True
 
         # --- Final fallback: regex-only from text ---
+        return self._regex_program(text, relpath), False
+
+    def _regex_program(self, text: str, relpath: str) -> Dict[str, Any]:
         program_id = self._guess_program_id(text) or self._program_id_from_filename(relpath)
-        paragraphs, calls_all, io_all = _edges_from_text(text)
-        copybooks  = self._find_copybooks(text)
+        paragraphs, calls_all, io_all, copybooks = _edges_from_text(text)
 
         ast: Dict[str, Any] = {
             "type": "program",
             "program_id": program_id,
             "divisions": _detect_divisions(text, program_id),
             "paragraphs": paragraphs or [{"name": "MAIN", "performs": [], "calls": [], "io_ops": []}],
-            "copybooks_used": sorted(copybooks),
+            "copybooks_used": copybooks,
             "_calls_all": calls_all,
             "_io_ops_all": _normalize_io_ops(io_all),
         }
@@ -276,16 +958,21 @@ class ProLeapAdapter:
         dialect: str,
         dump_raw: bool = False,
         dump_dir: Optional[str] = None,  # kept for API compatibility (unused; we prefer env)
+        src_path: Optional[str] = None,
     ) -> Dict[str, Any]:
         want_dump = _should_dump(dump_raw)
-
-        xml_str, attempts, raw_out = self._run_cb2xml(text, dialect, relpath, is_copybook=True)
-        if want_dump:
-            _dump_json(_dump_path_for(relpath, "cb2xml_copy", ".attempts.json"), attempts)
-            if xml_str:
-                _dump_text(_dump_path_for(relpath, "cb2xml_copy", ".xml"), xml_str)
-            elif raw_out:
-                _dump_text(_dump_path_for(relpath, "cb2xml_copy", ".txt"), raw_out)
+        self._refresh_probes()
+        key = None if want_dump else _ast_key("ast-copybook", text, relpath, dialect, self._tool_version())
+        cached = parse_cache.get(key) if key else None
+        if cached is not None:
+            return cached
+
+        xml_str, xml_path = self._run_dumped(
+            "cb2xml_copy", lambda: self._run_cb2xml(
+                text, dialect, relpath, is_copybook=True, src_path=src_path, keep_output=want_dump
+            ),
+            text, dialect, relpath, want_dump,
+        )
 
         name = self._copybook_name_from_filename(relpath)
 
@@ -293,9 +980,11 @@ class ProLeapAdapter:
             items = self._from_cb2xml_copybook_items(xml_str)
             if items:
                 res: Dict[str, Any] = {"type": "copybook", "name": name, "items": items}
-                if want_dump:
-                    res["_raw_dump_path"] = str(_dump_path_for(relpath, "cb2xml_copy", ".xml"))
+                if xml_path:
+                    res["_raw_dump_path"] = str(xml_path)
                 res.pop("notes", None)
+                if key:
+                    parse_cache.put(key, res)
                 return res
 
         # fallback: regex
@@ -304,152 +993,187 @@ class ProLeapAdapter:
 
     # ------------------------- Java runners -------------------------
 
-    def _run_proleap(self, cobol_src: str, dialect: str, relpath: str) -> Tuple[Optional[str], list, str]:
+    def _run_dumped(
+        self,
+        tool: str,
+        run: Callable[[], Tuple[Optional[str], list, str]],
+        src: str,
+        dialect: str,
+        relpath: str,
+        want_dump: bool,
+    ) -> Tuple[Optional[str], Optional[Path]]:
+        """
+        Run one Java tool, recording debug dumps when asked. With dumps on, an
+        existing XML dump for the same input and tool version is returned without
+        running the tool; its attempts file then names the reused dump.
+        """
+        if not want_dump:
+            return run()[0], None
+        xml_path = _xml_dump_path(tool, src, dialect, self._tool_version())
+        xml_str = _read_dump(xml_path)
+        if xml_str:
+            _dump_json(_dump_path_for(relpath, tool, ".attempts.json"), [{"mode": "dump", "path": str(xml_path)}])
+            return xml_str, xml_path
+        xml_str, attempts, raw_out = run()
+        _dump_json(_dump_path_for(relpath, tool, ".attempts.json"), attempts)
+        if xml_str:
+            _dump_text(xml_path, xml_str)
+        elif raw_out:
+            _dump_text(_dump_path_for(relpath, tool, ".txt"), raw_out)
+        return xml_str, xml_path if xml_str else None
+
+    def _proleap_launch(self, dialect: str) -> Tuple[str, str, Dict[str, str]]:
+        # Prefer the bridge jar & main.
+        cp = (os.environ.get("PROLEAP_CLASSPATH") or "/opt/proleap/lib/proleap-cli-bridge.jar").strip()
+        main = (os.environ.get("PROLEAP_MAIN") or "com.renova.proleap.CLI").strip()
+        return cp, main, _java_env(dialect)
+
+    def _cli(self, cmd: List[str], env: Dict[str, str], stdin_bytes: Optional[bytes] = None) -> Tuple[int, bytes, bytes]:
+        """`_run_java` for a `java -cp CP MAIN ...` command, recording what later attempts can skip."""
+        try:
+            rc, out, err = _run_java(cmd, env, stdin_bytes)
+        except FileNotFoundError:
+            self._java_missing = True
+            raise
+        if rc != 0 and _NO_MAIN_CLASS in err:
+            self._dead_mains.add((cmd[2], cmd[3]))
+        return rc, out, err
+
+    def _run_proleap(
+        self, cobol_src: str, dialect: str, relpath: str, src_path: Optional[str] = None
+    ) -> Tuple[Optional[str], list, str]:
         """
         Run ProLeap via classpath. Prefer the bridge CLI (com.renova.proleap.CLI).
-        Accepts stdin if supported, else temp-file mode.
+        Accepts stdin if supported, else file mode (`src_path` as is, or a temp copy).
 
         Returns: (xml_or_none, attempts[], raw_combined_text)
         """
         attempts: List[Dict[str, Any]] = []
         combined_text_out = ""
 
-        # Prefer the bridge jar & main.
-        cp = (os.environ.get("PROLEAP_CLASSPATH") or "/opt/proleap/lib/proleap-cli-bridge.jar").strip()
-        main = (os.environ.get("PROLEAP_MAIN") or "com.renova.proleap.CLI").strip()
-        mains = [m for m in [main] if m]
+        cp, main, env = self._proleap_launch(dialect)
 
-        env = os.environ.copy()
-        env["COBOL_DIALECT"] = dialect
+        # stdin form, then the file forms; the one that last produced XML goes first
+        forms: List[Tuple[str, Tuple[str, ...]]] = [("stdin", ("-stdin",)), ("file", ()), ("file", ("-xml",)), ("file", ("--xml",))]
+        if self._proleap_pick in forms:
+            forms.remove(self._proleap_pick)
+            forms.insert(0, self._proleap_pick)
 
-        def _try_stdin(src: str, tag: str) -> Tuple[Optional[str], str]:
-            cmd = ["java", "-cp", cp, mains[0], "-stdin"]
-            attempts.append({"mode": "stdin", "cmd": cmd, "tag": tag})
-            try:
-                out = subprocess.check_output(cmd, input=src.encode("utf-8"),
-                                              stderr=subprocess.STDOUT, env=env)
-                s = out.decode("utf-8", errors="replace")
-                return (s if s.strip().startswith("<") else None, f"\n# {cmd}\n{s}\n")
-            except subprocess.CalledProcessError as e:
-                msg = e.output.decode("utf-8", errors="replace") if e.output else str(e)
-                return (None, f"\n# {cmd} FAILED (exit {e.returncode}):\n{msg}\n")
-            except Exception as e:
-                return (None, f"\n# {cmd} FAILED (exception): {e}\n")
-
-        def _try_file(src: str, tag: str) -> Tuple[Optional[str], str]:
+        def _try_cli(src: str, tag: str, path: Optional[str] = None) -> Tuple[Optional[str], str]:
             out_log = ""
-            with tempfile.NamedTemporaryFile(prefix="proleap_in_", suffix=".cbl", delete=False) as tmp:
-                tmp.write(src.encode("utf-8")); tmp.flush()
-                in_path = tmp.name
+            in_path: Optional[str] = None
             try:
-                for args in ([in_path], ["-xml", in_path], ["--xml", in_path]):
-                    cmd = ["java", "-cp", cp, mains[0], *args]
-                    attempts.append({"mode": "file", "cmd": cmd, "tag": tag})
+                for form in forms:
+                    if self._java_missing or (cp, main) in self._dead_mains:
+                        break
+                    mode, flags = form
+                    if mode == "stdin":
+                        cmd, stdin_bytes = ["java", "-cp", cp, main, *flags], src.encode("utf-8")
+                    else:
+                        if in_path is None:
+                            in_path = path or _write_temp(src.encode("utf-8"), "proleap_in_", ".cbl")
+                        cmd, stdin_bytes = ["java", "-cp", cp, main, *flags, in_path], None
+                    attempts.append({"mode": mode, "cmd": cmd, "tag": tag})
                     try:
-                        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, env=env)
-                        s = out.decode("utf-8", errors="replace")
-                        out_log += f"\n# {cmd}\n{s}\n"
-                        if s.strip().startswith("<"):
-                            return s, out_log
-                    except subprocess.CalledProcessError as e:
-                        msg = e.output.decode("utf-8", errors="replace") if e.output else str(e)
-                        out_log += f"\n# {cmd} FAILED (exit {e.returncode}):\n{msg}\n"
+                        rc, out, err = self._cli(cmd, env, stdin_bytes)
                     except Exception as e:
                         out_log += f"\n# {cmd} FAILED (exception): {e}\n"
+                        continue
+                    s, log = _tool_log(cmd, rc, out, err)
+                    out_log += log
+                    if rc == 0 and s.strip().startswith("<"):
+                        self._proleap_pick = form
+                        return s, out_log
             finally:
-                try:
-                    os.remove(in_path)
-                except Exception:
-                    pass
+                if in_path and not path:
+                    try:
+                        os.remove(in_path)
+                    except Exception:
+                        pass
             return None, out_log
 
         # 1) Try original source via stdin, then file
-        s, log = _try_stdin(cobol_src, "original")
-        combined_text_out += log
-        if s:
-            return s, attempts, combined_text_out
-
-        s, log = _try_file(cobol_src, "original")
+        s, log = _try_cli(cobol_src, "original", src_path)
         combined_text_out += log
         if s:
             return s, attempts, combined_text_out
 
         # 2) If IMS markers detected, sanitize and retry once
-        if any(p.search(cobol_src) for p in _EXEC_BLOCKS) or \
-           "EXEC DLI" in cobol_src.upper() or "EXEC IMS" in cobol_src.upper() or \
-           "EXEC DLI" in combined_text_out.upper() or "EXEC IMS" in combined_text_out.upper():
+        if _has_unsupported_exec(cobol_src, combined_text_out):
             sanitized = _neutralize_unsupported_execs(cobol_src)
-            s, log = _try_stdin(sanitized, "sanitized_exec")
-            combined_text_out += log
-            if s:
-                return s, attempts, combined_text_out + "\n[SANITIZED RETRY OK]"
-
-            s, log = _try_file(sanitized, "sanitized_exec")
+            s, log = _try_cli(sanitized, "sanitized_exec")
             combined_text_out += log
             if s:
                 return s, attempts, combined_text_out + "\n[SANITIZED RETRY OK]"
 
         return None, attempts, combined_text_out.strip()
 
-    def _run_cb2xml(self, cobol_src: str, dialect: str, relpath: str, is_copybook: bool) -> tuple[Optional[str], list, str]:
+    def _run_cb2xml(
+        self, cobol_src: str, dialect: str, relpath: str, is_copybook: bool, src_path: Optional[str] = None,
+        keep_output: bool = True,
+    ) -> tuple[Optional[str], list, str]:
+        """
+        Returns (xml_or_none, attempts[], raw_combined_text). Tool output only
+        feeds the debug dumps, so with keep_output=False raw_combined_text stays
+        empty. Mains the JVM could not load are skipped from then on.
+        """
         attempts: List[Dict[str, Any]] = []
         combined_text_out = ""
+        if self._java_missing:
+            return None, attempts, "# java not found on PATH"
 
         cp = os.environ.get("CB2XML_CLASSPATH", "").strip() or "/opt/cb2xml/lib/*"
         mains = [os.environ.get("CB2XML_MAIN", "").strip()] if os.environ.get("CB2XML_MAIN") else []
         mains += ["net.sf.cb2xml.Cb2Xml", "net.sf.cb2xml.Cb2Xml2", "net.sf.cb2xml.cli.CLI"]
         mains = [m for m in mains if m]
 
-        env = os.environ.copy()
-        env["COBOL_DIALECT"] = dialect
-
-        # Try stdin first
-        for main in mains:
-            for flag in ("-stdin", "--stdin"):
-                cmd = ["java", "-cp", cp, main, flag]
-                attempts.append({"mode": "stdin", "cmd": cmd, "is_copybook": is_copybook})
+        env = _java_env(dialect)
+
+        # stdin forms first (one encode shared by every attempt), then file forms;
+        # the invocation that last produced XML goes first.
+        src_bytes = cobol_src.encode("utf-8")
+        combos: List[Tuple[str, str, Tuple[str, ...]]] = [
+            (main, "stdin", (flag,)) for main in mains for flag in ("-stdin", "--stdin")
+        ]
+        combos += [(main, "file", form) for main in mains for form in ((), ("-xml",), ("--xml",))]
+        if self._cb2xml_pick in combos:
+            combos.remove(self._cb2xml_pick)
+            combos.insert(0, self._cb2xml_pick)
+
+        # File mode reads the source file itself when it matches, else a temp copy
+        in_path: Optional[str] = None
+        try:
+            for combo in combos:
+                main, mode, args = combo
+                if self._java_missing:
+                    break
+                if (cp, main) in self._dead_mains:
+                    continue
+                if mode == "stdin":
+                    cmd, stdin_bytes = ["java", "-cp", cp, main, *args], src_bytes
+                else:
+                    if in_path is None:
+                        in_path = src_path or _write_temp(src_bytes, "cb2xml_in_", ".cpy" if is_copybook else ".cob")
+                    cmd, stdin_bytes = ["java", "-cp", cp, main, *args, in_path], None
+                attempts.append({"mode": mode, "cmd": cmd, "is_copybook": is_copybook})
                 try:
-                    out = subprocess.check_output(
-                        cmd, input=cobol_src.encode("utf-8"),
-                        stderr=subprocess.STDOUT, env=env
-                    )
-                    s = out.decode("utf-8", errors="replace")
-                    combined_text_out += f"\n# {cmd}\n{s}\n"
-                    if s.strip().startswith("<"):
-                        return s, attempts, combined_text_out
-                except subprocess.CalledProcessError as e:
-                    msg = e.output.decode("utf-8", errors="replace") if e.output else str(e)
-                    combined_text_out += f"\n# {cmd} FAILED (exit {e.returncode}):\n{msg}\n"
+                    rc, out, err = self._cli(cmd, env, stdin_bytes)
                 except Exception as e:
-                    combined_text_out += f"\n# {cmd} FAILED (exception): {e}\n"
-
-        # Temp file fallback
-        suffix = ".cpy" if is_copybook else ".cob"
-        with tempfile.NamedTemporaryFile(prefix="cb2xml_in_", suffix=suffix, delete=False) as tmp:
-            tmp.write(cobol_src.encode("utf-8"))
-            tmp.flush()
-            in_path = tmp.name
-        try:
-            for main in mains:
-                for args in ([in_path], ["-xml", in_path], ["--xml", in_path]):
-                    cmd = ["java", "-cp", cp, main, *args]
-                    attempts.append({"mode": "file", "cmd": cmd, "is_copybook": is_copybook})
-                    try:
-                        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, env=env)
-                        s = out.decode("utf-8", errors="replace")
-                        combined_text_out += f"\n# {cmd}\n{s}\n"
-                        if s.strip().startswith("<"):
-                            return s, attempts, combined_text_out
-                    except subprocess.CalledProcessError as e:
-                        msg = e.output.decode("utf-8", errors="replace") if e.output else str(e)
-                        combined_text_out += f"\n# {cmd} FAILED (exit {e.returncode}):\n{msg}\n"
-                    except Exception as e:
+                    if keep_output:
                         combined_text_out += f"\n# {cmd} FAILED (exception): {e}\n"
+                    continue
+                s, log = _tool_log(cmd, rc, out, err)
+                if keep_output:
+                    combined_text_out += log
+                if rc == 0 and s.strip().startswith("<"):
+                    self._cb2xml_pick = combo
+                    return s, attempts, combined_text_out
         finally:
-            try:
-                os.remove(in_path)
-            except Exception:
-                pass
+            if in_path and not src_path:
+                try:
+                    os.remove(in_path)
+                except Exception:
+                    pass
 
         return None, attempts, combined_text_out.strip()
 
@@ -459,84 +1183,44 @@ class ProLeapAdapter:
         """
         ProLeap XML varies by version; be defensive.
         """
-        try:
-            root = ET.fromstring(xml_str)
-        except ET.ParseError:
-            return None
-
-        program_id = self._find_xml_text(root, ["program-id", "programId", "PROGRAM-ID"]) \
-                     or self._program_id_from_filename(relpath)
-
-        # paragraph names if present
-        para_names = set()
-        for tag in ("paragraph", "Paragraph", "para", "paragraphName"):
-            for node in root.findall(f".//{tag}"):
-                nm = (node.get("name") or (node.text or "")).strip()
-                if nm:
-                    para_names.add(nm.upper())
-        paragraphs = [{"name": p, "performs": [], "calls": [], "io_ops": []}
-                      for p in sorted(para_names)] or [{"name": "MAIN", "performs": [], "calls": [], "io_ops": []}]
-
-        # copybooks
-        copybooks = set()
-        for tag in ("copy", "copybook", "COPY"):
-            for node in root.findall(f".//{tag}"):
-                nm = (node.get("name") or (node.text or "")).strip()
-                if nm:
-                    copybooks.add(nm.upper())
-
-        return {
-            "type": "program",
-            "program_id": program_id,
-            "divisions": {"identification": {}, "environment": {}, "data": {}, "procedure": {}},
-            "paragraphs": paragraphs,
-            "copybooks_used": sorted(copybooks),
-        }
+        return self._program_from_xml(xml_str, relpath)
 
     def _from_cb2xml_program(self, xml_str: str, relpath: str) -> Optional[Dict[str, Any]]:
-        try:
-            root = ET.fromstring(xml_str)
-        except ET.ParseError:
+        return self._program_from_xml(xml_str, relpath)
+
+    def _program_from_xml(self, xml_str: str, relpath: str) -> Optional[Dict[str, Any]]:
+        root = _parse_xml(xml_str)
+        if root is None:
             return None
 
-        program_id = self._find_xml_text(root, ["program-id", "programId", "PROGRAM-ID"]) \
-                     or self._program_id_from_filename(relpath)
+        by_tag = _index_tags(root, _PROGRAM_XML_TAGS)
+        program_id = self._find_xml_text(by_tag, _PROGRAM_ID_TAGS) or self._program_id_from_filename(relpath)
 
-        para_names = set()
-        for tag in ("paragraph", "Paragraph", "para", "paragraphName"):
-            for node in root.findall(f".//{tag}"):
-                nm = (node.get("name") or (node.text or "")).strip()
-                if nm:
-                    para_names.add(nm.upper())
+        # paragraph names if present
         paragraphs = [{"name": p, "performs": [], "calls": [], "io_ops": []}
-                      for p in sorted(para_names)] or [{"name": "MAIN", "performs": [], "calls": [], "io_ops": []}]
-
-        copybooks = set()
-        for tag in ("copy", "copybook", "COPY"):
-            for node in root.findall(f".//{tag}"):
-                nm = (node.get("name") or (node.text or "")).strip()
-                if nm:
-                    copybooks.add(nm.upper())
+                      for p in sorted(_names_under(by_tag, _PARA_TAGS))] or [{"name": "MAIN", "performs": [], "calls": [], "io_ops": []}]
 
         return {
             "type": "program",
             "program_id": program_id,
             "divisions": {"identification": {}, "environment": {}, "data": {}, "procedure": {}},
             "paragraphs": paragraphs,
-            "copybooks_used": sorted(copybooks),
+            "copybooks_used": sorted(_names_under(by_tag, _COPY_TAGS)),
         }
 
     def _from_cb2xml_copybook_items(self, xml_str: str) -> Optional[List[Dict[str, Any]]]:
-        try:
-            root = ET.fromstring(xml_str)
-        except ET.ParseError:
+        root = _parse_xml(xml_str)
+        if root is None:
             return None
 
         items: List[Dict[str, Any]] = []
-        for node in root.findall(".//*"):
-            level = (node.get("level") or "").strip()
-            name  = (node.get("name") or node.get("fieldname") or (node.text or "")).strip()
-            if level == "01" and name:
+        # only elements carrying a level attribute can be 01 items
+        for node in root.findall(".//*[@level]"):
+            # most items are not 01; settle that before looking at names
+            if (node.get("level") or "").strip() != "01":
+                continue
+            name = (node.get("name") or node.get("fieldname") or (node.text or "")).strip()
+            if name:
                 items.append({"level": "01", "name": name.upper(), "picture": "", "children": []})
         return items or None
 
@@ -566,20 +1250,14 @@ class ProLeapAdapter:
         m = _PROGRAM_ID_RE.search(text)
         return m.group(1).upper() if m else None
 
-    def _find_copybooks(self, text: str) -> List[str]:
-        return sorted({m.group(1).upper() for m in _COPY_RE.finditer(text)})
 
-    def _find_xml_text(self, root: Optional[ET.Element], candidates: List[str]) -> Optional[str]:
-        if root is None:
-            return None
+    def _find_xml_text(self, by_tag: Dict[str, List[Any]], candidates: List[str]) -> Optional[str]:
+        """Upper-cased text (else name) of the first element per candidate tag, first non-empty wins."""
         for tag in candidates:
-            node = root.find(f".//{tag}")
-            if node is not None:
+            nodes = by_tag.get(tag)
+            if nodes:
+                node = nodes[0]
                 val = (node.text or node.get("name") or "").strip()
                 if val:
                     return val.upper()
-            for n in root.findall(".//*"):
-                val = (n.get("name") or "").strip()
-                if val and tag.lower() == "name":
-                    return val.upper()
         return None
@@ -1,35 +1,92 @@
 # integrations/mcp/cobol/cobol-parser-mcp/src/utils/discovery.py
 from __future__ import annotations
 import os
-from typing import Iterable, List, Tuple, Set
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Tuple
 
 COBOL_EXT = {".cbl", ".cob", ".cobol"}
 COPY_EXT = {".cpy", ".copy"}
 
-def walk_sources(root: str) -> Iterable[Tuple[str, str, str]]:
+def walk_sources(root: str) -> Iterator[Tuple[str, str, str]]:
     """
     Yield (abs_path, relpath, kind) where kind ∈ {"cobol","copybook"}.
+    Same top-down order as os.walk; relpaths are built by prefix concat
+    rather than os.path.relpath per file.
     """
-    for dirpath, _, files in os.walk(root):
-        for fn in files:
-            ext = os.path.splitext(fn)[1].lower()
-            if ext in COBOL_EXT:
-                abs_p = os.path.join(dirpath, fn)
-                rel_p = os.path.relpath(abs_p, root)
-                yield abs_p, rel_p, "cobol"
-            elif ext in COPY_EXT:
-                abs_p = os.path.join(dirpath, fn)
-                rel_p = os.path.relpath(abs_p, root)
-                yield abs_p, rel_p, "copybook"
+    stack: List[Tuple[str, str]] = [(root, "")]
+    while stack:
+        dirpath, rel_prefix = stack.pop()
+        subdirs: List[Tuple[str, str]] = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # like os.walk(followlinks=False): list, don't descend
+                        if not entry.is_symlink():
+                            subdirs.append((entry.path, rel_prefix + entry.name + os.sep))
+                        continue
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in COBOL_EXT:
+                        yield entry.path, rel_prefix + entry.name, "cobol"
+                    elif ext in COPY_EXT:
+                        yield entry.path, rel_prefix + entry.name, "copybook"
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))
+
+def allow_set(allow_paths: List[str] | None) -> FrozenSet[str] | None:
+    """Normalized relpath allow list, or None when every path is allowed."""
+    if not allow_paths:
+        return None
+    return frozenset(p.strip().lstrip("./") for p in allow_paths if p.strip())
 
 def filter_paths(
     items: Iterable[Tuple[str, str, str]],
     allow_paths: List[str] | None,
-) -> Iterable[Tuple[str, str, str]]:
-    if not allow_paths:
+) -> Iterator[Tuple[str, str, str]]:
+    allowed = allow_set(allow_paths)
+    if allowed is None:
         yield from items
         return
-    allow_set: Set[str] = {p.strip().lstrip("./") for p in allow_paths if p.strip()}
     for abs_p, rel_p, kind in items:
-        if rel_p in allow_set:
+        if rel_p in allowed:
+            yield abs_p, rel_p, kind
+
+def _walked_dir(root: str, rel_dir: str, seen: Dict[str, bool]) -> bool:
+    """Whether walk_sources descends into `rel_dir`: every component a real directory, none a symlink."""
+    if not rel_dir:
+        return True
+    hit = seen.get(rel_dir)
+    if hit is None:
+        parent, _sep, _name = rel_dir.rpartition(os.sep)
+        path = os.path.join(root, rel_dir)
+        hit = _walked_dir(root, parent, seen) and os.path.isdir(path) and not os.path.islink(path)
+        seen[rel_dir] = hit
+    return hit
+
+def allowed_sources(root: str, allow_paths: List[str]) -> Iterator[Tuple[str, str, str]]:
+    """
+    Resolve an explicit allow list with a few stats per entry instead of walking
+    the tree. Yields what filter_paths(walk_sources(root), ...) would, ordered
+    by relpath: entries under a symlinked directory, which the walk does not
+    enter, are left out.
+    """
+    dirs: Dict[str, bool] = {}
+    for rel_p in sorted(allow_set(allow_paths) or ()):
+        # only plain relative paths can match a walked relpath
+        if os.path.isabs(rel_p) or os.path.normpath(rel_p) != rel_p:
+            continue
+        ext = os.path.splitext(rel_p)[1].lower()
+        if ext in COBOL_EXT:
+            kind = "cobol"
+        elif ext in COPY_EXT:
+            kind = "copybook"
+        else:
+            continue
+        abs_p = os.path.join(root, rel_p)
+        # like the walk: anything that is not a directory, once its parents were walked
+        if _walked_dir(root, os.path.dirname(rel_p), dirs) and os.path.lexists(abs_p) and not os.path.isdir(abs_p):
             yield abs_p, rel_p, kind
@@ -13,24 +13,35 @@ BOMS = [
     (codecs.BOM_UTF16_LE, "utf-16-le"),
     (codecs.BOM_UTF16_BE, "utf-16-be"),
 ]
+BOM_PREFIXES = tuple(bom for bom, _enc in BOMS)
 
 def detect_encoding(raw: bytes, hint: str | None = None) -> Tuple[str, bytes]:
     """Return (encoding, decoded_bytes_without_bom)."""
+    enc, bom_len = detect_encoding_view(raw, hint)
+    return enc, raw[bom_len:] if bom_len else raw
+
+def detect_encoding_view(buf, hint: str | None = None) -> Tuple[str, int]:
+    """
+    Buffer-protocol variant of `detect_encoding` (bytes, memoryview, mmap).
+    Returns (encoding, bom_length) so callers can slice the payload without copying.
+    """
     if hint:
         try:
-            text = raw.decode(hint, errors="strict")
-            return hint, raw.lstrip(b"")  # no BOM removal for hinted enc
+            str(buf, hint, "strict")
+            return hint, 0  # no BOM removal for hinted enc
         except Exception:
             pass
 
+    head = bytes(buf[:4])
     for bom, enc in BOMS:
-        if raw.startswith(bom):
-            return enc, raw[len(bom):]
+        if head.startswith(bom):
+            return enc, len(bom)
 
     if chardet:
-        guess = chardet.detect(raw) or {}
+        # chardet only accepts bytes/bytearray
+        guess = chardet.detect(buf if isinstance(buf, (bytes, bytearray)) else bytes(buf)) or {}
         enc = guess.get("encoding") or "utf-8"
     else:
         enc = "utf-8"
 
-    return enc, raw
+    return enc, 0
@@ -1,8 +1,13 @@
 # integrations/mcp/cobol/cobol-parser-mcp/src/utils/hashing.py
 from __future__ import annotations
 import hashlib
+from typing import BinaryIO
 
 def sha256_bytes(b: bytes) -> str:
     h = hashlib.sha256()
     h.update(b)
     return h.hexdigest()
+
+def sha256_file(f: BinaryIO) -> str:
+    """Stream an open binary file through SHA-256 without materializing it."""
+    return hashlib.file_digest(f, "sha256").hexdigest()
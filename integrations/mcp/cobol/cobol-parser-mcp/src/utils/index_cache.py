@@ -0,0 +1,75 @@
+# integrations/mcp/cobol/cobol-parser-mcp/src/utils/index_cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from typing import Any, Dict
+
+import orjson
+
+# Per-root cache of source-index entries, so unchanged files are not re-opened
+# or re-hashed by the next build_source_index over the same tree.
+#
+# Layout: <cache_root>/<sha256(root)>.json holding {relpath: [[mtime_ns, size], meta|null]}
+# (null marks a file that was looked at but is not indexed).
+# Env:
+#   INDEX_CACHE_DIR: cache root (default: $XDG_CACHE_HOME/renova/index, else
+#                    <tempdir>/renova_cache/index)
+#   INDEX_CACHE:     set to 0/false/no to disable lookups and writes
+#
+# _FORMAT is part of the file name; bump it when the meta layout changes so
+# entries written by an older build are not reused.
+_FORMAT = "2"
+
+
+def _enabled() -> bool:
+    return os.environ.get("INDEX_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def cache_root() -> str:
+    root = os.environ.get("INDEX_CACHE_DIR")
+    if root:
+        return root
+    # outside the workspace, so the cache never shows up in the trees we walk
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    if xdg:
+        return os.path.join(xdg, "renova", "index")
+    return os.path.join(tempfile.gettempdir(), "renova_cache", "index")
+
+
+def _path_for(root: str) -> str:
+    k = hashlib.sha256(f"{_FORMAT}\0{os.path.abspath(root)}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_root(), f"{k}.json")
+
+
+def load(root: str) -> Dict[str, Any]:
+    if not _enabled():
+        return {}
+    try:
+        with open(_path_for(root), "rb") as f:
+            data = orjson.loads(f.read())
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def save(root: str, entries: Dict[str, Any]) -> None:
+    """Best-effort atomic write; a read-only or missing cache dir is not an error."""
+    if not _enabled():
+        return
+    path = _path_for(root)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(entries))
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+    except Exception:
+        pass
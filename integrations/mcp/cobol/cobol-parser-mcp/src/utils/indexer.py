@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import functools
 import os
+import stat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-from .hashing import sha256_bytes
+try:
+    import pyfs_watcher  # type: ignore  # Rust walker/hasher (parallel sha256)
+except Exception:
+    pyfs_watcher = None
+
+from . import index_cache
+from .encoding import detect_encoding_view
+from .hashing import sha256_file
 
 # File type buckets
 COBOL_EXT = {".cbl", ".cob", ".cobol"}
@@ -19,9 +29,17 @@ DEFAULT_SKIP_DIRS = {
     "node_modules", ".pnpm-store", "vendor",
     "build", "dist", "target", "out", "bin", "obj",
     ".idea", ".vscode", ".venv", "venv", "__pycache__",
-    ".pytest_cache", "coverage",
+    ".pytest_cache", "coverage", ".renova_cache",
 }
 
+# Encodings worth recording from a head sample: strict decoders that fail loudly
+# (and fall back to detection) if the rest of the file disagrees.
+_HINTABLE_ENCODINGS = {"ascii", "utf-8"}
+
+# Below this many changed files, worker process start-up outweighs the sniffing
+# (the part of indexing that holds the GIL) it would spread across cores.
+_PROCESS_MIN_FILES = 256
+
 # Only include these kinds in the source_index (keeps the index small & relevant)
 INCLUDED_KINDS = {"cobol", "copybook", "jcl", "ddl", "bms"}
 
@@ -59,13 +77,6 @@ def _format_hint(first_k_lines: List[str]) -> str:
         return "FREE"
     return "FIXED"
 
-def _read_head(path: Path, max_bytes: int = 4096) -> bytes:
-    try:
-        with path.open("rb") as f:
-            return f.read(max_bytes)
-    except Exception:
-        return b""
-
 def _first_lines(sample: bytes) -> List[str]:
     try:
         txt = sample.decode("utf-8", errors="ignore")
@@ -73,61 +84,180 @@ def _first_lines(sample: bytes) -> List[str]:
         txt = ""
     return txt.splitlines()
 
+def _index_file(abs_p: Path, rel_p: Path, hash_now: bool = True) -> Dict[str, object] | None:
+    """
+    Sniff + hash one file; None when it is not an indexed kind. Raises OSError.
+    With hash_now=False the sha256 is left "" for `_hash_many` to fill in.
+    """
+    # One open per file: sniff the head, then hash from the same handle.
+    with abs_p.open("rb") as f:
+        head = f.read(4096)
+        lines = _first_lines(head)
+        kind = _classify_kind(abs_p, lines)
+
+        # Only index the kinds we care about (keeps payload small/fast)
+        if kind not in INCLUDED_KINDS:
+            return None
+
+        # Stream sha256 for the files we actually index
+        sha = ""
+        if hash_now:
+            f.seek(0)
+            sha = sha256_file(f)
+        size = os.fstat(f.fileno()).st_size
+    meta: Dict[str, object] = {
+        "relpath": str(rel_p).replace("\\", "/"),
+        "size_bytes": size,
+        "sha256": sha,
+        "kind": kind,
+    }
+    if kind in {"cobol", "copybook"}:
+        meta["language_hint"] = "COBOL"
+        meta["format_hint"] = _format_hint(lines)
+        meta["copybook_dir_hint"] = _copybook_dir_hint(rel_p.parent)
+        enc, bom_len = detect_encoding_view(head)
+        if not bom_len and enc.lower() in _HINTABLE_ENCODINGS:
+            meta["encoding_hint"] = enc.lower()
+    return meta
+
+def _hash_path(p: str) -> str:
+    try:
+        with open(p, "rb") as f:
+            return sha256_file(f)
+    except OSError:
+        return ""
+
+def _hash_many(paths: List[str]) -> Dict[str, str]:
+    """sha256 for many files at once on all cores; unreadable files are left out."""
+    out: Dict[str, str] = {}
+    if pyfs_watcher is not None:
+        try:
+            for r in pyfs_watcher.hash_files(paths, algorithm="sha256"):
+                out[str(r.path)] = r.hash_hex
+        except Exception:
+            pass
+    rest = [p for p in paths if p not in out]
+    if len(rest) > 1:
+        # hashlib drops the GIL while digesting, so threads overlap reads and hashing
+        with ThreadPoolExecutor() as ex:
+            digests = list(ex.map(_hash_path, rest))
+    else:
+        digests = [_hash_path(p) for p in rest]
+    for p, sha in zip(rest, digests):
+        if sha:
+            out[p] = sha
+    return out
+
+def _try_index(root_p: Path, abs_s: str, hash_now: bool) -> Dict[str, object] | None | bool:
+    abs_p = Path(abs_s)
+    try:
+        return _index_file(abs_p, abs_p.relative_to(root_p), hash_now)
+    except OSError:
+        return False
+
+def _index_workers() -> int:
+    try:
+        n = int(os.environ.get("INDEX_WORKERS") or os.cpu_count() or 1)
+    except ValueError:
+        n = 1
+    return max(1, n)
+
+def _index_changed(root_p: Path, paths: List[str]) -> List[Dict[str, object] | None | bool]:
+    """
+    `_index_file` results for changed files, in order; False marks a file that
+    could not be read. Without pyfs_watcher each file is sniffed and hashed
+    through its one open: on worker processes for large batches when there are
+    cores to spare, else on threads (hashlib drops the GIL while digesting).
+    With pyfs_watcher, files are sniffed here and hashed in one Rust batch.
+    """
+    if pyfs_watcher is None:
+        if len(paths) < 2:
+            return [_try_index(root_p, p, True) for p in paths]
+        one = functools.partial(_try_index, root_p, hash_now=True)
+        workers = _index_workers()
+        if workers > 1 and len(paths) >= _PROCESS_MIN_FILES:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    return list(ex.map(one, paths, chunksize=64))
+            except Exception:
+                pass  # no usable worker processes here; threads still overlap the I/O
+        with ThreadPoolExecutor() as ex:
+            return list(ex.map(one, paths))
+    metas = [_try_index(root_p, p, False) for p in paths]
+    hashes = _hash_many([p for p, meta in zip(paths, metas) if meta])
+    for i, (p, meta) in enumerate(zip(paths, metas)):
+        if meta:
+            if p in hashes:
+                meta["sha256"] = hashes[p]
+            else:
+                metas[i] = False
+    return metas
+
 def build_source_index(root: str) -> Dict[str, object]:
     """
     Build a compact source index focusing on COBOL-related inputs.
     Skips heavy, irrelevant directories by default (override with INDEX_SKIP_DIRS).
+    Files whose (mtime, size) match the previous build of this root reuse its
+    entry without being opened (see index_cache).
     """
     root_p = Path(root)
-    files: List[Dict[str, object]] = []
+    cached = index_cache.load(root)
+    seen: Dict[str, list] = {}
+    dirty = False
+    # (relpath, abs path, stamp) of new or changed files, indexed after the walk
+    changed: List[Tuple[str, str, list]] = []
 
     # Resolve skip dirs from env (comma-separated)
     skip_env = os.environ.get("INDEX_SKIP_DIRS", "")
     skip_dirs = {d.strip() for d in skip_env.split(",") if d.strip()} or DEFAULT_SKIP_DIRS
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        # prune directories in-place for os.walk efficiency
-        dirnames[:] = [d for d in dirnames if d not in skip_dirs]
-
-        for fn in filenames:
-            abs_p = Path(dirpath) / fn
-            if not abs_p.is_file():
-                continue
-
-            rel_p = abs_p.relative_to(root_p)
-            sample = _read_head(abs_p, 4096)
-            lines = _first_lines(sample)
-            kind = _classify_kind(abs_p, lines)
-
-            # Only index the kinds we care about (keeps payload small/fast)
-            if kind not in INCLUDED_KINDS:
-                continue
-
-            # Stream sha256 for the files we actually index
-            sha = _sha256_file(abs_p)
-            meta: Dict[str, object] = {
-                "relpath": str(rel_p).replace("\\", "/"),
-                "size_bytes": abs_p.stat().st_size,
-                "sha256": sha,
-                "kind": kind,
-            }
-            if kind in {"cobol", "copybook"}:
-                meta["language_hint"] = "COBOL"
-                meta["format_hint"] = _format_hint(lines)
-                meta["copybook_dir_hint"] = _copybook_dir_hint(rel_p.parent)
-            files.append(meta)
+    # scandir walk (os.walk's top-down, no-followlinks traversal without its
+    # per-directory relpath/join work); files are stat'ed through their DirEntry
+    stack: List[Tuple[str, str]] = [(root, "")]
+    while stack:
+        dirpath, rel_prefix = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                for e in it:
+                    try:
+                        is_dir = e.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if e.name not in skip_dirs and not e.is_symlink():
+                            stack.append((e.path, rel_prefix + e.name + "/"))
+                        continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    if not stat.S_ISREG(st.st_mode):
+                        continue
+
+                    rel_s = rel_prefix + e.name
+                    stamp = [st.st_mtime_ns, st.st_size]
+                    entry = cached.get(rel_s)
+                    if not entry or entry[0] != stamp:
+                        dirty = True
+                        changed.append((rel_s, e.path, stamp))
+                        continue
+                    seen[rel_s] = entry
+        except OSError:
+            continue
+
+    metas = _index_changed(root_p, [abs_s for _rel, abs_s, _stamp in changed])
+    for (rel_s, _abs, stamp), meta in zip(changed, metas):
+        if meta is not False:  # unreadable now; not remembered, so retried next build
+            seen[rel_s] = [stamp, meta]
+
+    # callers sanitize entries in place; keep the cached copies intact
+    files = [dict(e[1]) for e in seen.values() if e[1] is not None]
+    if dirty or len(seen) != len(cached):
+        index_cache.save(root, seen)
 
     files.sort(key=lambda f: f["relpath"])  # deterministic order
     return {"root": str(root_p), "files": files}
 
-def _sha256_file(path: Path) -> str:
-    import hashlib
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 64), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
 def derive_copy_paths(index: Dict[str, object]) -> list[str]:
     """Pick candidate directories to search for copybooks (relative to root)."""
     files = index.get("files", [])
@@ -0,0 +1,105 @@
+# integrations/mcp/cobol/cobol-parser-mcp/src/utils/parse_cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import orjson
+
+# Content-addressed cache of validated artifact bodies.
+#
+# Layout: <cache_root>/<k[:2]>/<k[2:]>.json where k = sha256(key string).
+# Env:
+#   PARSE_CACHE_DIR: cache root (default: $XDG_CACHE_HOME/renova/parse, else
+#                    <tempdir>/renova_cache/parse)
+#   PARSE_CACHE:     set to 0/false/no to disable lookups and writes
+#
+# Recent entries are also kept in memory, by path, as their serialized bytes (not
+# dicts, so every caller still decodes its own copy): repeat lookups skip the open + read.
+_MEM_MAX = 1024
+_MEM: "OrderedDict[str, bytes]" = OrderedDict()
+_MEM_LOCK = threading.Lock()
+
+
+def _enabled() -> bool:
+    return os.environ.get("PARSE_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def cache_root() -> str:
+    root = os.environ.get("PARSE_CACHE_DIR")
+    if root:
+        return root
+    # outside the workspace, so the cache never shows up in the trees we walk
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    if xdg:
+        return os.path.join(xdg, "renova", "parse")
+    return os.path.join(tempfile.gettempdir(), "renova_cache", "parse")
+
+
+def make_key(content_hash: str, kind: str, dialect: str, name_hint: str, version: str, extra: str = "") -> str:
+    """
+    Build the lookup key. `name_hint` is the file basename because program_id/copybook
+    names fall back to it; `extra` carries anything else the output depends on
+    (e.g. a fingerprint of the copybook dirs used for COPY expansion).
+    """
+    return f"{content_hash}:{kind}:{dialect}:{name_hint}:{version}:{extra}"
+
+
+def _remember(path: str, data: bytes) -> None:
+    with _MEM_LOCK:
+        _MEM[path] = data
+        _MEM.move_to_end(path)
+        while len(_MEM) > _MEM_MAX:
+            _MEM.popitem(last=False)
+
+
+def _path_for(key: str) -> str:
+    k = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_root(), k[:2], f"{k[2:]}.json")
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    if not _enabled():
+        return None
+    path = _path_for(key)
+    with _MEM_LOCK:
+        data = _MEM.get(path)
+        if data is not None:
+            _MEM.move_to_end(path)
+    try:
+        if data is not None:
+            return orjson.loads(data)
+        with open(path, "rb") as f:
+            data = f.read()
+        obj = orjson.loads(data)
+        _remember(path, data)
+        return obj
+    except Exception:
+        return None
+
+
+def put(key: str, artifact: Dict[str, Any]) -> None:
+    """Best-effort atomic write; a read-only or missing cache dir is not an error."""
+    if not _enabled():
+        return
+    path = _path_for(key)
+    try:
+        data = orjson.dumps(artifact)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            _remember(path, data)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+    except Exception:
+        pass
@@ -0,0 +1,48 @@
+# integrations/mcp/cobol/cobol-parser-mcp/src/utils/paths.py
+from __future__ import annotations
+
+import os
+from string import ascii_letters
+
+def _has_win_drive(p: str) -> bool:
+    # same as ^[A-Za-z]:\\ without entering the regex engine
+    return len(p) >= 3 and p[1] == ":" and p[2] == "\\" and p[0] in ascii_letters
+
+def normalize_root(root: str, ws_host: str | None, ws_ctr: str) -> str:
+    """
+    Map a host path to the container mount. Pure string munging with the
+    workspace settings passed in, so it has no env or module state.
+
+      ws_host: absolute host path (e.g. /Users/alice/Projects/Renova), may be empty
+      ws_ctr:  mount path inside container
+    """
+    if not root:
+        return root
+
+    # Already container-relative?
+    if root.startswith(ws_ctr):
+        return root
+
+    # Normalize Windows-style paths C:\\foo\\bar → /c/foo/bar
+    r = root
+    if _has_win_drive(r):
+        drive, rest = r[:2], r[2:]
+        r = f"/{drive[0].lower()}{rest}".replace("\\", "/")
+    else:
+        r = r.replace("\\", "/")
+
+    # Replace workspace host prefix with container prefix
+    if ws_host:
+        ws_host_norm = ws_host.replace("\\", "/").rstrip("/")
+        if r.startswith(ws_host_norm + "/") or r == ws_host_norm:
+            suffix = r[len(ws_host_norm):].lstrip("/")
+            return os.path.join(ws_ctr, suffix) if suffix else ws_ctr
+
+    # Relative paths → resolve against container workspace
+    if not r.startswith("/"):
+        return os.path.normpath(os.path.join(ws_ctr, r))
+
+    # As-is if valid, else best-effort remap
+    if os.path.exists(r):
+        return r
+    return os.path.join(ws_ctr, r.lstrip("/"))
@@ -2,14 +2,21 @@
 from __future__ import annotations
 import json
 import os
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 from jsonschema import Draft202012Validator
 
+# Optional: compiled validators for the common (valid) path
+try:
+    import fastjsonschema  # type: ignore
+except Exception:
+    fastjsonschema = None  # type: ignore
+
 class SchemaRegistry:
     def __init__(self, base_dir: str) -> None:
         self.base_dir = base_dir
         self._schemas: Dict[str, Dict[str, Any]] = {}
         self._validators: Dict[str, Draft202012Validator] = {}
+        self._compiled: Dict[str, Callable[[Any], Any]] = {}
         self._load()
 
     def _load(self) -> None:
@@ -24,6 +31,11 @@ class SchemaRegistry:
                 schema = json.load(f)
             self._schemas[kind] = schema
             self._validators[kind] = Draft202012Validator(schema)
+            if fastjsonschema is not None:
+                try:
+                    self._compiled[kind] = fastjsonschema.compile(schema)
+                except Exception:
+                    pass  # unsupported construct → jsonschema only
 
     def validate(self, artifact: Dict[str, Any]) -> list[str]:
         """
@@ -47,4 +59,12 @@ class SchemaRegistry:
             # If there's truly no payload, surface a single, clear error.
             return ["artifact has neither 'body' nor 'data' payload"]
 
+        compiled = self._compiled.get(kind)
+        if compiled is not None:
+            try:
+                compiled(payload)
+                return []
+            except fastjsonschema.JsonSchemaException:
+                pass  # fall through for the full, jsonschema-formatted error list
+
         return [e.message for e in validator.iter_errors(payload)]
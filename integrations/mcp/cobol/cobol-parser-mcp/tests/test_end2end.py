@@ -0,0 +1,97 @@
+# integrations/mcp/cobol/cobol-parser-mcp/tests/test_end2end.py
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+from src import main
+from src.utils import parse_cache
+
+PAYROLL = b"""       IDENTIFICATION DIVISION.
+       PROGRAM-ID. PAYROLL.
+       DATA DIVISION.
+       WORKING-STORAGE SECTION.
+       COPY EMPREC.
+       PROCEDURE DIVISION.
+       MAIN-PARA.
+           PERFORM CALC-PARA
+           STOP RUN.
+       CALC-PARA.
+           CALL "PAYCALC"
+           WRITE OUT-REC.
+"""
+SMALL = b"""       IDENTIFICATION DIVISION.
+       PROGRAM-ID. SMALL.
+       PROCEDURE DIVISION.
+           STOP RUN.
+"""
+EMPREC = b"""       01 EMP-REC.
+          05 EMP-ID PIC 9(5).
+"""
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    ws = tmp_path / "ws"
+    for rel, data in [
+        ("app/cbl/PAYROLL.cbl", PAYROLL),
+        ("app/cbl/SMALL.cob", SMALL),
+        ("app/cpy/EMPREC.cpy", EMPREC),
+        ("dup/EMPREC.cpy", EMPREC),  # same bytes: deduplicated within a page
+    ]:
+        path = ws / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    monkeypatch.setenv("PARSE_CACHE_DIR", str(tmp_path / "cache" / "parse"))
+    monkeypatch.setenv("INDEX_CACHE_DIR", str(tmp_path / "cache" / "index"))
+    monkeypatch.setenv("RENOVA_PARSE_WORKERS", "1")
+    monkeypatch.delenv("PARSE_CACHE", raising=False)
+    parse_cache._MEM.clear()
+    yield str(ws)
+    main._shutdown_workers()
+    parse_cache._MEM.clear()
+
+
+def _by_relpath(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {
+        art["body"]["source"]["relpath"]: art
+        for art in result["artifacts"]
+        if art["kind"] != "cam.asset.source_index"
+    }
+
+
+def test_parse_tree_reuse_matches_cold_run(workspace, monkeypatch):
+    # reference: every file parsed on its own, with nothing to reuse
+    monkeypatch.setenv("PARSE_CACHE", "0")
+    full = main.parse_tree({"root": workspace})
+    expected: Dict[str, Dict[str, Any]] = {}
+    for rel in _by_relpath(full):
+        expected.update(_by_relpath(main.parse_tree({"root": workspace, "paths": [rel]})))
+    assert sorted(expected) == ["app/cbl/PAYROLL.cbl", "app/cbl/SMALL.cob", "app/cpy/EMPREC.cpy", "dup/EMPREC.cpy"]
+
+    # dedup: the duplicate copybook reuses its twin's parse
+    assert full["stats"]["files_deduplicated"] == 1
+    assert _by_relpath(full) == expected
+    monkeypatch.delenv("PARSE_CACHE")
+
+    # cache: a cold run fills it, a warm one is served from it
+    cold = main.parse_tree({"root": workspace})
+    warm = main.parse_tree({"root": workspace})
+    assert warm["stats"]["cache_hits"] > 0 and warm["stats"]["cache_misses"] == 0
+    assert _by_relpath(cold) == expected
+    assert _by_relpath(warm) == expected
+
+    # pagination: the pages together give the same artifacts
+    paged: Dict[str, Dict[str, Any]] = {}
+    starts: List[int] = []
+    start = 0
+    while True:
+        page = main.parse_tree({"root": workspace, "start_at": start, "file_limit": 2})
+        paged.update(_by_relpath(page))
+        starts.append(start)
+        if not page["continuation"]["has_more"]:
+            break
+        start = page["continuation"]["next"]
+    assert len(starts) > 1
+    assert paged == expected
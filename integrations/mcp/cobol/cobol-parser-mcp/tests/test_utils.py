@@ -0,0 +1,117 @@
+# integrations/mcp/cobol/cobol-parser-mcp/tests/test_utils.py
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from src.utils import parse_cache
+from src.utils.discovery import allowed_sources, filter_paths, walk_sources
+from src.utils.paths import normalize_root
+
+WS_CTR = "/mnt/work"
+
+
+# ------------------------------ paths ------------------------------
+@pytest.mark.parametrize(
+    "root, ws_host, expected",
+    [
+        ("", "/Users/alice/Renova", ""),
+        ("/mnt/work/app", "/Users/alice/Renova", "/mnt/work/app"),
+        ("/Users/alice/Renova/app/cbl", "/Users/alice/Renova", "/mnt/work/app/cbl"),
+        ("/Users/alice/Renova", "/Users/alice/Renova/", "/mnt/work"),
+        # a shared prefix that is not a path component is not the workspace
+        ("/Users/alice/RenovaX/app", "/Users/alice/Renova", "/mnt/work/Users/alice/RenovaX/app"),
+        ("C:\\Repo\\app", "/c/Repo", "/mnt/work/app"),
+        ("C:\\Repo\\app", None, "/mnt/work/c/Repo/app"),
+        ("app/../src", None, "/mnt/work/src"),
+        ("/no/such/dir", None, "/mnt/work/no/such/dir"),
+    ],
+)
+def test_normalize_root(root, ws_host, expected):
+    assert normalize_root(root, ws_host, WS_CTR) == expected
+
+
+def test_normalize_root_keeps_existing_absolute_path(tmp_path):
+    assert normalize_root(str(tmp_path), None, WS_CTR) == str(tmp_path)
+
+
+# ---------------------------- discovery ----------------------------
+def _touch(path, data=b""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_allowed_sources_matches_filtered_walk(tmp_path):
+    _touch(tmp_path / "app" / "cbl" / "PAY.cbl")
+    _touch(tmp_path / "app" / "cbl" / "OLD.COB")
+    _touch(tmp_path / "app" / "cpy" / "EMP.cpy")
+    _touch(tmp_path / "app" / "notes.txt")
+    (tmp_path / "dir.cbl").mkdir()
+    (tmp_path / "linked").symlink_to(tmp_path / "app", target_is_directory=True)
+    (tmp_path / "alias.cbl").symlink_to(tmp_path / "app" / "cbl" / "PAY.cbl")
+    (tmp_path / "dangling.cpy").symlink_to(tmp_path / "gone.cpy")
+
+    allow = [
+        "./app/cbl/PAY.cbl",
+        "app/cbl/OLD.COB",
+        " app/cpy/EMP.cpy ",
+        "app/notes.txt",
+        "app/cbl/NOPE.cbl",
+        "dir.cbl",
+        "linked/cbl/PAY.cbl",
+        "alias.cbl",
+        "dangling.cpy",
+        "app/../app/cbl/PAY.cbl",
+        str(tmp_path / "app" / "cbl" / "PAY.cbl"),
+        "",
+    ]
+    root = str(tmp_path)
+    walked = sorted(filter_paths(walk_sources(root), allow), key=lambda t: t[1])
+    assert list(allowed_sources(root, allow)) == walked
+    assert [rel for _abs, rel, _kind in walked] == [
+        "alias.cbl",
+        "app/cbl/OLD.COB",
+        "app/cbl/PAY.cbl",
+        "app/cpy/EMP.cpy",
+        "dangling.cpy",
+    ]
+
+
+# --------------------------- parse cache ---------------------------
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PARSE_CACHE_DIR", str(tmp_path / "parse"))
+    monkeypatch.delenv("PARSE_CACHE", raising=False)
+    parse_cache._MEM.clear()
+    yield tmp_path / "parse"
+    parse_cache._MEM.clear()
+
+
+def test_parse_cache_round_trip(cache_dir):
+    key = parse_cache.make_key("ab" * 32, "cobol", "COBOL85", "PAY.cbl", "v1")
+    art = {"kind": "cam.cobol.program", "body": {"program_id": "PAY", "paragraphs": []}}
+    assert parse_cache.get(key) is None
+
+    parse_cache.put(key, art)
+    assert parse_cache.get(key) == art
+    assert len([f for _d, _s, files in os.walk(cache_dir) for f in files]) == 1
+
+    # every lookup decodes its own copy
+    parse_cache.get(key)["body"]["program_id"] = "CHANGED"
+    assert parse_cache.get(key) == art
+
+    # and the entry survives the in-memory layer
+    parse_cache._MEM.clear()
+    assert parse_cache.get(key) == art
+
+    other = parse_cache.make_key("ab" * 32, "cobol", "COBOL85", "PAY.cbl", "v2")
+    assert parse_cache.get(other) is None
+
+
+def test_parse_cache_disabled(cache_dir, monkeypatch):
+    key = parse_cache.make_key("cd" * 32, "copybook", "COBOL85", "EMP.cpy", "v1")
+    monkeypatch.setenv("PARSE_CACHE", "0")
+    parse_cache.put(key, {"kind": "cam.cobol.copybook"})
+    assert parse_cache.get(key) is None
+    assert not cache_dir.exists()